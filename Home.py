@@ -2,14 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 from utils.styles import inject_styles
-from utils.data_helpers import (
-    load_drivers,
-    load_races,
-    load_constructors,
-    load_season_predictions,
-    load_race_predictions,
-    load_fun_predictions,
-)
+from utils.telemetry import finish_run, start_run
+from utils.data_helpers import load_tables
 from utils.ui_helpers import (
     render_navbar,
     render_hero,
@@ -28,18 +22,29 @@ st.set_page_config(
     layout="wide",
 )
 
+start_run("home")
 inject_styles()
 st.markdown(render_navbar("home"), unsafe_allow_html=True)
 
 # ---------------------------------------------------------------------------
 # Data
 # ---------------------------------------------------------------------------
-drivers_df = load_drivers()
-races_df = load_races()
-constructors_df = load_constructors()
-season_df = load_season_predictions()
-race_pred_df = load_race_predictions()
-fun_pred_df = load_fun_predictions()
+# Predictions are only counted here, so the compact id-array loaders
+# (shared with the prediction pages) are enough.
+tables = load_tables(
+    "drivers",
+    "races",
+    "constructors",
+    "season_prediction_ids",
+    "race_prediction_ids",
+    "fun_predictions",
+)
+drivers_df = tables["drivers"]
+races_df = tables["races"]
+constructors_df = tables["constructors"]
+season_df = tables["season_prediction_ids"]
+race_pred_df = tables["race_prediction_ids"]
+fun_pred_df = tables["fun_predictions"]
 
 # ---------------------------------------------------------------------------
 # Next-race countdown
@@ -98,6 +103,12 @@ st.markdown(
         ("", "Fun Predictions",
          "Hot takes, wild guesses, and bold calls for the season.",
          "/Fun_Predictions"),
+        ("", "Leaderboard",
+         "Points from every scored race and the running <strong>league standings</strong>.",
+         "/Leaderboard"),
+        ("", "Insights",
+         "Simulate the rest of the season from anyone's picks.",
+         "/Insights"),
     ]),
     unsafe_allow_html=True,
 )
@@ -109,3 +120,4 @@ st.markdown(render_section_header("2026 Race Calendar"), unsafe_allow_html=True)
 st.markdown(render_race_calendar(races_df), unsafe_allow_html=True)
 
 st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
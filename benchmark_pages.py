@@ -0,0 +1,254 @@
+"""Headless page benchmarks against an in-process storage backend.
+
+Runs Home.py and every script in pages/ through Streamlit's AppTest, with
+the storage client replaced by a temporary SQLite database wrapped in
+:class:`LatencyClient`, which adds a fixed delay to every ``execute()``
+and counts calls per table. For each synthetic dataset size it reports:
+
+* cold-start time (empty read and render caches) and backend calls
+* per-rerun latency (median / max) and backend calls per rerun
+* rendered bytes (serialized size of every element on the page)
+
+No Supabase project or network access is needed.
+
+Usage:
+    python benchmark_pages.py [--users 2 10 100 1000] [--latency-ms 40] [--reruns 5]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from utils import data_helpers, ui_helpers
+from utils.constants import CONSTRUCTOR_POSITIONS, DRIVER_POSITIONS
+from utils.db import set_client
+from utils.sqlite_backend import SQLiteClient
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGES = [os.path.join(ROOT, "Home.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+INSERT_CHUNK = 500
+
+
+# ---------------------------------------------------------------------------
+# Stand-in backend
+# ---------------------------------------------------------------------------
+
+class _LatencyQuery:
+    """Forwards the query-builder chain; ``execute()`` sleeps and is counted."""
+
+    def __init__(self, client: "LatencyClient", table: str, query: Any) -> None:
+        self._client = client
+        self._table = table
+        self._query = query
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._query, name)
+
+        def chain(*args: Any, **kwargs: Any) -> "_LatencyQuery":
+            self._query = method(*args, **kwargs)
+            return self
+
+        return chain
+
+    def execute(self) -> Any:
+        self._client.record(self._table)
+        time.sleep(self._client.latency)
+        return self._query.execute()
+
+
+class LatencyClient:
+    """Wraps any client with the ``table()`` chain, adding per-call latency."""
+
+    def __init__(self, inner: Any, latency_ms: float = 0.0) -> None:
+        self.inner = inner
+        self.latency = latency_ms / 1000
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _LatencyQuery:
+        return _LatencyQuery(self, name, self.inner.table(name))
+
+    def record(self, table: str) -> None:
+        with self._lock:
+            self.calls[table] += 1
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def _insert(client: SQLiteClient, table: str, rows: list[dict]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        client.table(table).insert(rows[start:start + INSERT_CHUNK]).execute()
+
+
+def build_dataset(path: str, n_users: int, n_results: int, seed: int = 0) -> SQLiteClient:
+    """Create a database with *n_users* synthetic users' predictions.
+
+    Every user gets a season prediction, a prediction for every race and
+    two fun predictions; the first *n_results* races get a result.
+    """
+    rng = np.random.default_rng(seed)
+    client = SQLiteClient(path)
+    drivers = client.table("drivers").select("id,driver_name").order("id").execute().data
+    constructors = client.table("constructors").select("id,team_name").order("id").execute().data
+    races = [r["race_name"] for r in client.table("races").select("race_name").order("round_number").execute().data]
+    driver_ids = np.array([d["id"] for d in drivers])
+    driver_names = {d["id"]: d["driver_name"] for d in drivers}
+    constructor_ids = np.array([c["id"] for c in constructors])
+    constructor_names = {c["id"]: c["team_name"] for c in constructors}
+
+    def ordering(ids: np.ndarray, names: dict[int, str], positions: list[str], col: str) -> dict:
+        perm = [int(i) for i in rng.permutation(ids)[: len(positions)]]
+        return {**{p: names[i] for p, i in zip(positions, perm)}, col: perm}
+
+    race_positions = data_helpers.RACE_POSITIONS
+    users = [f"Bench User {i:04d}" for i in range(n_users)]
+    start = datetime(2026, 1, 1)
+    _insert(client, "season_predictions", [
+        {
+            "user": u,
+            **ordering(driver_ids, driver_names, DRIVER_POSITIONS, "d_ids"),
+            **ordering(constructor_ids, constructor_names, CONSTRUCTOR_POSITIONS, "c_ids"),
+        }
+        for u in users
+    ])
+    _insert(client, "race_predictions", [
+        {"race": race, "user": u, **ordering(driver_ids, driver_names, race_positions, "p_ids")}
+        for race in races
+        for u in users
+    ])
+    _insert(client, "race_results", [
+        {"race": race, **ordering(driver_ids, driver_names, race_positions, "p_ids")}
+        for race in races[:n_results]
+    ])
+    _insert(client, "fun_predictions", [
+        {
+            "user": u,
+            "prediction": f"Prediction {k} from {u}",
+            "date_created": (start + timedelta(minutes=i * 2 + k)).isoformat(),
+        }
+        for i, u in enumerate(users)
+        for k in range(2)
+    ])
+    return client
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _reset_caches() -> None:
+    data_helpers.invalidate_cache()
+    for name in dir(ui_helpers):
+        fn = getattr(ui_helpers, name)
+        while fn is not None:  # renderers may be instrumented on top of lru_cache
+            if callable(getattr(fn, "cache_clear", None)):
+                fn.cache_clear()
+            fn = getattr(fn, "__wrapped__", None)
+
+
+def rendered_bytes(node: Any) -> int:
+    """Serialized size of every element below *node* in an AppTest tree."""
+    children = getattr(node, "children", None)
+    if children:
+        return sum(rendered_bytes(c) for c in children.values())
+    proto = getattr(node, "proto", None)
+    return proto.ByteSize() if proto is not None else 0
+
+
+def bench_page(page: str, client: LatencyClient, reruns: int, timeout: float) -> dict:
+    _reset_caches()
+    client.calls.clear()
+    at = AppTest.from_file(page, default_timeout=timeout)
+    t0 = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - t0) * 1000
+    cold_calls = client.total_calls()
+
+    rerun_ms: list[float] = []
+    rerun_calls: list[int] = []
+    for _ in range(reruns):
+        before = client.total_calls()
+        t0 = time.perf_counter()
+        at.run()
+        rerun_ms.append((time.perf_counter() - t0) * 1000)
+        rerun_calls.append(client.total_calls() - before)
+
+    return {
+        "page": os.path.relpath(page, ROOT),
+        "cold_ms": round(cold_ms, 1),
+        "cold_calls": cold_calls,
+        "rerun_ms": round(statistics.median(rerun_ms), 1) if rerun_ms else None,
+        "rerun_max_ms": round(max(rerun_ms), 1) if rerun_ms else None,
+        "rerun_calls": round(statistics.mean(rerun_calls), 1) if rerun_calls else None,
+        "bytes": rendered_bytes(at.main),
+        "errors": [str(e.value) for e in at.exception],
+    }
+
+
+def run(user_counts: list[int], latency_ms: float, reruns: int, n_results: int, timeout: float) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_users in user_counts:
+            inner = build_dataset(os.path.join(tmp, f"bench_{n_users}.db"), n_users, n_results)
+            set_client(inner)
+            data_helpers.rebuild_leaderboard()
+            client = LatencyClient(inner, latency_ms)
+            set_client(client)
+            for page in PAGES:
+                results.append({"users": n_users, **bench_page(page, client, reruns, timeout)})
+            set_client(None)
+    return results
+
+
+def _print_table(results: list[dict]) -> None:
+    header = f"{'users':>6}  {'page':<32} {'cold ms':>9} {'calls':>5}  {'rerun ms':>9} {'max':>8} {'calls':>5}  {'bytes':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['users']:>6}  {r['page']:<32} {r['cold_ms']:>9.1f} {r['cold_calls']:>5}  "
+            f"{r['rerun_ms'] or 0:>9.1f} {r['rerun_max_ms'] or 0:>8.1f} {r['rerun_calls'] or 0:>5}  {r['bytes']:>9,}"
+        )
+        for err in r["errors"]:
+            print(f"        ⚠ {err}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[2, 10, 100, 1000], help="synthetic dataset sizes")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="delay added to every backend call")
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns per page")
+    parser.add_argument("--results", type=int, default=6, help="races with an official result")
+    parser.add_argument("--timeout", type=float, default=120.0, help="AppTest timeout per run (seconds)")
+    parser.add_argument("--json", metavar="PATH", help="also write the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.users, args.latency_ms, args.reruns, args.results, args.timeout)
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
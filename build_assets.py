@@ -0,0 +1,43 @@
+"""Build the minified, content-hashed stylesheet into static/.
+
+The app builds it on first use anyway (utils/styles.py); run this at deploy
+time to do it ahead of the first visitor, or to check the size savings.
+``--clean`` removes stylesheets from earlier builds.
+
+Usage:
+    python build_assets.py [--clean]
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import gzip
+import os
+import sys
+
+from utils.styles import STATIC_DIR, CSS_PATH, build_stylesheet, write_static
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clean", action="store_true", help="delete stylesheets from earlier builds")
+    args = parser.parse_args()
+
+    imports, css, name = build_stylesheet()
+    path = write_static(name, css)
+    source = os.path.getsize(CSS_PATH)
+    print(f"  ✅ {os.path.relpath(path)}")
+    print(f"     {source:,} bytes -> {len(css):,} minified ({len(gzip.compress(css.encode())):,} gzipped)")
+    for url in imports:
+        print(f"     linked separately: {url}")
+
+    if args.clean:
+        for old in glob.glob(os.path.join(STATIC_DIR, "style.*.css")):
+            if os.path.basename(old) != name:
+                os.remove(old)
+                print(f"  🗑  removed {os.path.relpath(old)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
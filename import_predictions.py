@@ -0,0 +1,62 @@
+"""Import race or season predictions from a CSV file in bulk.
+
+The layout is detected from the header:
+
+* race predictions: ``race,user,P1..P22`` (as in data/race_predictions.csv)
+* season predictions: ``user,D1..D22,C1..C11`` (as in data/season_predictions.csv)
+
+Rows are validated against the drivers, constructors and races tables and
+written in chunked multi-row upserts; problems are reported per CSV line.
+
+Usage:
+    python import_predictions.py predictions.csv [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+import pandas as pd
+
+from utils.constants import CONSTRUCTOR_POSITIONS, DRIVER_POSITIONS
+from utils.data_helpers import RACE_POSITIONS, upsert_race_predictions, upsert_season_predictions
+
+LAYOUTS = {
+    "race": (["race", "user"] + RACE_POSITIONS, upsert_race_predictions),
+    "season": (["user"] + DRIVER_POSITIONS + CONSTRUCTOR_POSITIONS, upsert_season_predictions),
+}
+
+
+def detect_layout(columns: list[str]) -> str | None:
+    for name, (required, _) in LAYOUTS.items():
+        if set(required) <= set(columns):
+            return name
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV with race,user,P1..P22 or user,D1..D22,C1..C11 columns")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.path, dtype=str).fillna("")
+    layout = detect_layout(list(df.columns))
+    if layout is None:
+        print("ERROR: header matches neither race (race,user,P1..P22) nor season (user,D1..D22,C1..C11) layout")
+        return 1
+    columns, upsert = LAYOUTS[layout]
+
+    rows = df[columns].to_dict(orient="records")
+    result = upsert(rows, dry_run=args.dry_run)
+    for i, problem in sorted(result.errors.items()):
+        print(f"  ❌ line {i + 2}: {problem}")  # header is line 1
+    if args.dry_run:
+        print(f"{len(rows) - len(result.errors)} of {len(rows)} {layout} prediction(s) valid (dry run)")
+    else:
+        print(f"{result.written} of {len(rows)} {layout} prediction(s) imported")
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Import official race results from a CSV file.
+
+The file uses the same layout as race predictions: a ``race`` column with
+the race name (as in races.csv) followed by P1..P22 driver names. Rows are
+validated against the drivers and races tables and written in chunked
+multi-row upserts through the configured storage backend (Supabase or
+local SQLite); problems are reported per CSV line.
+
+Usage:
+    python import_race_results.py results.csv [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+import pandas as pd
+
+from utils.data_helpers import RACE_POSITIONS, upsert_race_results
+
+COLUMNS = ["race"] + RACE_POSITIONS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV file with race,P1..P22 columns")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.path, dtype=str).fillna("")
+    missing = [c for c in COLUMNS if c not in df.columns]
+    if missing:
+        print(f"ERROR: results file is missing columns: {', '.join(missing)}")
+        return 1
+
+    rows = df[COLUMNS].to_dict(orient="records")
+    result = upsert_race_results(rows, dry_run=args.dry_run)
+    for i, problem in sorted(result.errors.items()):
+        print(f"  ❌ line {i + 2}: {problem}")  # header is line 1
+    if args.dry_run:
+        print(f"{len(rows) - len(result.errors)} of {len(rows)} result(s) valid (dry run)")
+    else:
+        print(f"{result.written} of {len(rows)} result(s) imported")
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,15 +7,19 @@ from utils.constants import (
     TEAM_COLORS,
 )
 from utils.data_helpers import (
-    load_drivers,
-    load_constructors,
-    load_season_predictions,
-    upsert_season_prediction,
+    load_tables,
+    load_season_prediction_ids,
+    expand_season_predictions,
+    save_season_picks,
     delete_season_prediction,
+    VersionConflictError,
 )
+from utils.projection import project_standings
 from utils.styles import inject_styles
+from utils.telemetry import finish_run, fragment_run, start_run
 from utils.ui_helpers import (
-    driver_with_team,
+    build_option_index,
+    driver_option_index,
     pos_class,
     render_navbar,
     render_page_header,
@@ -29,6 +33,7 @@ from utils.ui_helpers import (
 )
 
 st.set_page_config(page_title="Season Predictions", page_icon="", layout="wide")
+start_run("season")
 inject_styles()
 st.markdown(render_navbar("season"), unsafe_allow_html=True)
 
@@ -46,25 +51,31 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # Data
 # ---------------------------------------------------------------------------
-drivers_df = load_drivers()
-constructors_df = load_constructors()
-season_df = load_season_predictions()
-
-driver_names = drivers_df["Driver Name"].tolist()
-constructor_names = constructors_df["Team Name"].tolist()
-driver_teams = dict(zip(drivers_df["Driver Name"], drivers_df["Driver Team"]))
-
 # --- User selector ---
 col_user, _ = st.columns([1, 2])
 with col_user:
     user = st.selectbox("User", USERS, key="season_user")
 
+# Pre-fill only needs the selected user's row, filtered server-side.
+tables = load_tables("drivers", "constructors", "races", season_prediction_ids={"user": user})
+drivers_df = tables["drivers"]
+constructors_df = tables["constructors"]
+races_df = tables["races"]
+existing = expand_season_predictions(tables["season_prediction_ids"])
+
+driver_names = drivers_df["Driver Name"].tolist()
+constructor_names = constructors_df["Team Name"].tolist()
+driver_index = driver_option_index(drivers_df)
+constructor_index = build_option_index(tuple(constructor_names))
+driver_teams = driver_index.teams
+
 # --- Pre-fill logic ---
-existing = season_df[season_df["user"] == user]
 prefilled_drivers: dict[str, str] = {}
 prefilled_constructors: dict[str, str] = {}
+prefilled_version: int | None = None
 if not existing.empty:
     row = existing.iloc[0]
+    prefilled_version = int(row["version"])
     for pos in DRIVER_POSITIONS:
         val = str(row.get(pos, ""))
         if val in driver_names:
@@ -78,7 +89,9 @@ if not existing.empty:
 # Initialize session-state selections (once per user)
 # ---------------------------------------------------------------------------
 state_key = f"_season_init_{user}"
+version_key = f"_season_version_{user}"
 if st.session_state.get(state_key) != user:
+    st.session_state[version_key] = prefilled_version
     for pos in DRIVER_POSITIONS:
         st.session_state[f"season_driver_{pos}"] = prefilled_drivers.get(pos, PLACEHOLDER)
     for pos in CONSTRUCTOR_POSITIONS:
@@ -89,44 +102,10 @@ if st.session_state.get(state_key) != user:
 # Helpers
 # ---------------------------------------------------------------------------
 
-def get_selected_drivers(exclude_pos: str) -> set[str]:
-    selected = set()
-    for p in DRIVER_POSITIONS:
-        if p == exclude_pos:
-            continue
-        val = st.session_state.get(f"season_driver_{p}", PLACEHOLDER)
-        if val != PLACEHOLDER:
-            selected.add(val)
-    return selected
-
-
-def get_selected_constructors(exclude_pos: str) -> set[str]:
-    selected = set()
-    for p in CONSTRUCTOR_POSITIONS:
-        if p == exclude_pos:
-            continue
-        val = st.session_state.get(f"season_constructor_{p}", PLACEHOLDER)
-        if val != PLACEHOLDER:
-            selected.add(val)
-    return selected
-
-
-def calculate_constructor_standings_from_drivers() -> list[str]:
-    team_positions: dict[str, list[int]] = {}
-    for i, pos in enumerate(DRIVER_POSITIONS):
-        driver = st.session_state.get(f"season_driver_{pos}", PLACEHOLDER)
-        if driver != PLACEHOLDER and driver in driver_teams:
-            team = driver_teams[driver]
-            team_positions.setdefault(team, []).append(i + 1)
-    team_scores = {}
-    for team, positions in team_positions.items():
-        positions.sort()
-        team_scores[team] = sum(positions[:2])
-    return [team for team, _ in sorted(team_scores.items(), key=lambda x: x[1])]
-
-
 def auto_populate_constructors():
-    constructor_order = calculate_constructor_standings_from_drivers()
+    # Projected points from the driver picks (memoized per ordering).
+    driver_order = [st.session_state.get(f"season_driver_{pos}", PLACEHOLDER) for pos in DRIVER_POSITIONS]
+    constructor_order = project_standings(driver_order, driver_teams, len(races_df)).team_order
     if len(constructor_order) >= len(CONSTRUCTOR_POSITIONS):
         filled = sum(
             1 for pos in CONSTRUCTOR_POSITIONS
@@ -138,32 +117,40 @@ def auto_populate_constructors():
                     st.session_state[f"season_constructor_{pos}"] = constructor_order[i]
 
 
-# ---------------------------------------------------------------------------
-# Championships Side-by-Side
-# ---------------------------------------------------------------------------
-col_drivers, col_constructors = st.columns(2)
+def save_picks(picks: dict[str, str], label: str) -> None:
+    """Save one half of the season row, guarding against concurrent edits.
+
+    Either outcome reruns the whole page so the predictions below (and, on
+    a conflict, the form itself) reflect what is actually stored.
+    """
+    try:
+        new_version = save_season_picks(user, picks, st.session_state.get(version_key))
+    except VersionConflictError:
+        # Reload the latest saved picks into the form on the rerun.
+        st.session_state.pop(state_key, None)
+        st.session_state["_season_flash"] = (
+            f"{user}'s predictions were changed in another session, so these picks were not saved. "
+            "The latest saved picks have been loaded.",
+            "error",
+        )
+        st.rerun()
+    if new_version is not None:
+        st.session_state[version_key] = new_version
+        st.session_state["_season_flash"] = (f"{label} Championship saved for {user}!", "success")
+        st.rerun()
 
-# --- Drivers' Championship ---
-with col_drivers:
-    st.markdown(
-        '<div class="championship-section"><h3>Drivers\' Championship</h3>'
-        '<div class="championship-body">',
-        unsafe_allow_html=True,
-    )
 
+@st.fragment
+@fragment_run("season/drivers")
+def drivers_grid() -> None:
+    """Drivers' dropdown grid + submit. Picking a driver reruns only this fragment."""
     driver_selections: dict[str, str] = {}
+    driver_options = driver_index.grid_options({
+        pos: st.session_state.get(f"season_driver_{pos}", PLACEHOLDER) for pos in DRIVER_POSITIONS
+    })
 
     for i, pos in enumerate(DRIVER_POSITIONS):
         pc = pos_class(i + 1)
-        already_taken = get_selected_drivers(pos)
-        current_val = st.session_state.get(f"season_driver_{pos}", PLACEHOLDER)
-
-        available = [d for d in driver_names if d not in already_taken or d == current_val]
-        options = [PLACEHOLDER] + available
-        display_options = [PLACEHOLDER] + [driver_with_team(d, drivers_df) for d in available]
-
-        idx = options.index(current_val) if current_val in options else 0
-
         col_label, col_select = st.columns([0.2, 4], gap="small")
         with col_label:
             st.markdown(
@@ -173,8 +160,8 @@ with col_drivers:
         with col_select:
             chosen = st.selectbox(
                 f"Driver Position {i+1}",
-                options,
-                format_func=lambda v, _o=options, _d=display_options: _d[_o.index(v)],
+                driver_options[pos],
+                format_func=driver_index.label,
                 key=f"season_driver_{pos}",
                 label_visibility="collapsed",
             )
@@ -191,48 +178,28 @@ with col_drivers:
             if dupes:
                 st.markdown(render_toast(f"Duplicate drivers: {', '.join(sorted(dupes))}.", "error"), unsafe_allow_html=True)
             else:
-                # Build the full row, preserving existing constructor picks
-                existing_df = load_season_predictions()
-                existing_row = existing_df[existing_df["user"] == user]
-                full_row = {"user": user, **driver_selections}
-                if not existing_row.empty:
-                    for pos in CONSTRUCTOR_POSITIONS:
-                        full_row[pos] = existing_row.iloc[0].get(pos, PLACEHOLDER)
-                else:
-                    for pos in CONSTRUCTOR_POSITIONS:
-                        full_row[pos] = PLACEHOLDER
-                upsert_season_prediction(full_row)
-                st.markdown(render_toast(f"Drivers' Championship saved for {user}!", "success"), unsafe_allow_html=True)
+                save_picks(driver_selections, "Drivers'")
 
-    st.markdown("</div></div>", unsafe_allow_html=True)
-
-# --- Constructors' Championship ---
-with col_constructors:
-    st.markdown(
-        '<div class="championship-section"><h3>Constructors\' Championship</h3>'
-        '<div class="championship-body">',
-        unsafe_allow_html=True,
-    )
 
+@st.fragment
+@fragment_run("season/constructors")
+def constructors_grid() -> None:
+    """Constructors' dropdown grid, auto-calculate and submit, rerun in isolation."""
     col_auto, _ = st.columns([1, 1])
     with col_auto:
         if st.button("Auto-calculate from Drivers", use_container_width=True, key="auto_constructors"):
+            # The selectboxes below are created after this, so they pick up
+            # the new values in this same fragment run.
             auto_populate_constructors()
-            st.rerun()
 
     st.markdown("")
 
     constructor_selections: dict[str, str] = {}
+    constructor_options = constructor_index.grid_options({
+        pos: st.session_state.get(f"season_constructor_{pos}", PLACEHOLDER) for pos in CONSTRUCTOR_POSITIONS
+    })
     for i, pos in enumerate(CONSTRUCTOR_POSITIONS):
         pc = pos_class(i + 1)
-        already_taken = get_selected_constructors(pos)
-        current_val = st.session_state.get(f"season_constructor_{pos}", PLACEHOLDER)
-
-        available = [c for c in constructor_names if c not in already_taken or c == current_val]
-        options = [PLACEHOLDER] + available
-
-        idx = options.index(current_val) if current_val in options else 0
-
         col_label, col_select = st.columns([0.2, 4], gap="small")
         with col_label:
             st.markdown(
@@ -242,7 +209,7 @@ with col_constructors:
         with col_select:
             chosen = st.selectbox(
                 f"Constructor Position {i+1}",
-                options,
+                constructor_options[pos],
                 key=f"season_constructor_{pos}",
                 label_visibility="collapsed",
             )
@@ -259,21 +226,37 @@ with col_constructors:
             if dupes:
                 st.markdown(render_toast(f"Duplicate constructors: {', '.join(sorted(dupes))}.", "error"), unsafe_allow_html=True)
             else:
-                # Build the full row, preserving existing driver picks
-                existing_df = load_season_predictions()
-                existing_row = existing_df[existing_df["user"] == user]
-                full_row = {"user": user}
-                if not existing_row.empty:
-                    for pos in DRIVER_POSITIONS:
-                        full_row[pos] = existing_row.iloc[0].get(pos, PLACEHOLDER)
-                else:
-                    for pos in DRIVER_POSITIONS:
-                        full_row[pos] = PLACEHOLDER
-                for pos in CONSTRUCTOR_POSITIONS:
-                    full_row[pos] = constructor_selections[pos]
-                upsert_season_prediction(full_row)
-                st.markdown(render_toast(f"Constructors' Championship saved for {user}!", "success"), unsafe_allow_html=True)
+                save_picks(constructor_selections, "Constructors'")
+
+
+# ---------------------------------------------------------------------------
+# Championships Side-by-Side
+# ---------------------------------------------------------------------------
+# Saves rerun the whole page; their toast is carried across in session state.
+flash = st.session_state.pop("_season_flash", None)
+if flash:
+    st.markdown(render_toast(*flash), unsafe_allow_html=True)
+
+col_drivers, col_constructors = st.columns(2)
+
+# --- Drivers' Championship ---
+with col_drivers:
+    st.markdown(
+        '<div class="championship-section"><h3>Drivers\' Championship</h3>'
+        '<div class="championship-body">',
+        unsafe_allow_html=True,
+    )
+    drivers_grid()
+    st.markdown("</div></div>", unsafe_allow_html=True)
 
+# --- Constructors' Championship ---
+with col_constructors:
+    st.markdown(
+        '<div class="championship-section"><h3>Constructors\' Championship</h3>'
+        '<div class="championship-body">',
+        unsafe_allow_html=True,
+    )
+    constructors_grid()
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 # ---------------------------------------------------------------------------
@@ -282,7 +265,7 @@ with col_constructors:
 st.markdown(render_divider(accent=True), unsafe_allow_html=True)
 st.markdown(render_section_header("Current Predictions"), unsafe_allow_html=True)
 
-season_df = load_season_predictions()
+season_df = expand_season_predictions(load_season_prediction_ids())
 
 if season_df.empty:
     st.markdown(render_empty_state("No season predictions yet — be the first!"), unsafe_allow_html=True)
@@ -367,3 +350,4 @@ else:
             st.markdown("</div>", unsafe_allow_html=True)
 
 st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
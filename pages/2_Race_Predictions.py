@@ -1,9 +1,11 @@
 import streamlit as st
 from utils.constants import USERS, PLACEHOLDER, TEAM_COLORS
-from utils.data_helpers import load_drivers, load_races, load_race_predictions, upsert_race_prediction, delete_race_prediction
+from utils.data_helpers import load_tables, expand_race_predictions, upsert_race_prediction, delete_race_prediction
+from utils.scoring import score_predictions_by_id
 from utils.styles import inject_styles
+from utils.telemetry import finish_run, fragment_run, start_run
 from utils.ui_helpers import (
-    driver_with_team,
+    driver_option_index,
     pos_class,
     render_navbar,
     render_page_header,
@@ -14,9 +16,11 @@ from utils.ui_helpers import (
     render_footer,
     render_toast,
     render_empty_state,
+    render_stat_cards,
 )
 
 st.set_page_config(page_title="Race Predictions", page_icon="", layout="wide")
+start_run("race")
 inject_styles()
 st.markdown(render_navbar("race"), unsafe_allow_html=True)
 
@@ -40,12 +44,13 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # Data
 # ---------------------------------------------------------------------------
-drivers_df = load_drivers()
-races_df = load_races()
-race_pred_df = load_race_predictions()
+tables = load_tables("drivers", "races")
+drivers_df = tables["drivers"]
+races_df = tables["races"]
 
 driver_names = drivers_df["Driver Name"].tolist()
-driver_teams = dict(zip(drivers_df["Driver Name"], drivers_df["Driver Team"]))
+driver_index = driver_option_index(drivers_df)
+driver_teams = driver_index.teams
 
 race_labels = races_df.apply(
     lambda r: f"{r['Round Number']}  —  {r['Race Name']}", axis=1
@@ -61,10 +66,16 @@ with sel_col2:
 
 selected_race = race_name_list[race_labels.index(selected_label)]
 
+# Only this race's rows are fetched, as compact id arrays; the same (cached)
+# frame feeds the pre-fill, the scores and the predictions display below.
+race_tables = load_tables(
+    race_prediction_ids={"race": selected_race},
+    race_result_ids={"race": selected_race},
+)
+race_pred_df = expand_race_predictions(race_tables["race_prediction_ids"])
+
 # --- Pre-fill logic ---
-existing = race_pred_df[
-    (race_pred_df["race"] == selected_race) & (race_pred_df["user"] == user)
-]
+existing = race_pred_df[race_pred_df["user"] == user]
 prefilled: dict[str, str] = {}
 if not existing.empty:
     row = existing.iloc[0]
@@ -82,71 +93,66 @@ if st.session_state.get(state_key) != (user, selected_race):
         st.session_state[f"race_{pos}"] = prefilled.get(pos, PLACEHOLDER)
     st.session_state[state_key] = (user, selected_race)
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-def get_selected_drivers(exclude_pos: str) -> set[str]:
-    selected = set()
-    for p in POSITIONS:
-        if p == exclude_pos:
-            continue
-        val = st.session_state.get(f"race_{p}", PLACEHOLDER)
-        if val != PLACEHOLDER:
-            selected.add(val)
-    return selected
-
 # ---------------------------------------------------------------------------
 # Position dropdowns
 # ---------------------------------------------------------------------------
 st.markdown(render_section_header("Predicted Finishing Order"), unsafe_allow_html=True)
 
-selections: dict[str, str] = {}
+# A successful save reruns the whole page (to refresh the predictions below);
+# its toast is carried across that rerun in session state.
+flash = st.session_state.pop("_race_flash", None)
+if flash:
+    st.markdown(render_toast(*flash), unsafe_allow_html=True)
+
+
+@st.fragment
+@fragment_run("race/grid")
+def prediction_grid() -> None:
+    """Dropdown grid + submit. Picking a driver reruns only this fragment."""
+    selections: dict[str, str] = {}
+    options_by_pos = driver_index.grid_options({
+        pos: st.session_state.get(f"race_{pos}", PLACEHOLDER) for pos in POSITIONS
+    })
+
+    for i, pos in enumerate(POSITIONS):
+        pc = pos_class(i + 1)
+        col_label, col_select = st.columns([0.1, 4], gap="small")
+        with col_label:
+            st.markdown(
+                f'<div style="padding-top:0.45rem"><span class="pos-label {pc}">{pos}</span></div>',
+                unsafe_allow_html=True,
+            )
+        with col_select:
+            chosen = st.selectbox(
+                pos,
+                options_by_pos[pos],
+                format_func=driver_index.label,
+                key=f"race_{pos}",
+                label_visibility="collapsed",
+            )
+        selections[pos] = chosen
 
-for i, pos in enumerate(POSITIONS):
-    pc = pos_class(i + 1)
-    already_taken = get_selected_drivers(pos)
-    current_val = st.session_state.get(f"race_{pos}", PLACEHOLDER)
+    # --- Submit ---
+    st.markdown("")
+    if st.button("Submit Race Prediction", type="primary", use_container_width=True):
+        chosen_list = list(selections.values())
+        empty_slots = [p for p, v in selections.items() if v == PLACEHOLDER]
 
-    available = [d for d in driver_names if d not in already_taken or d == current_val]
-    options = [PLACEHOLDER] + available
-    display_options = [PLACEHOLDER] + [driver_with_team(d, drivers_df) for d in available]
+        if empty_slots:
+            st.markdown(render_toast(f"Missing: {', '.join(empty_slots)}. Fill every position.", "error"), unsafe_allow_html=True)
+        else:
+            dupes = {d for d in chosen_list if chosen_list.count(d) > 1}
+            if dupes:
+                st.markdown(render_toast(f"Duplicate drivers: {', '.join(sorted(dupes))}.", "error"), unsafe_allow_html=True)
+            else:
+                new_row = {"race": selected_race, "user": user, **selections}
+                # On failure the st.error stays on screen: no flash, no rerun.
+                if upsert_race_prediction(new_row):
+                    st.session_state["_race_flash"] = (f"Prediction for {selected_race} saved for {user}!", "success")
+                    st.rerun()
 
-    idx = options.index(current_val) if current_val in options else 0
 
-    col_label, col_select = st.columns([0.1, 4], gap="small")
-    with col_label:
-        st.markdown(
-            f'<div style="padding-top:0.45rem"><span class="pos-label {pc}">{pos}</span></div>',
-            unsafe_allow_html=True,
-        )
-    with col_select:
-        chosen = st.selectbox(
-            pos,
-            options,
-            format_func=lambda v, _o=options, _d=display_options: _d[_o.index(v)],
-            index=idx,
-            key=f"race_{pos}",
-            label_visibility="collapsed",
-        )
-    selections[pos] = chosen
-
-# --- Submit ---
-st.markdown("")
-if st.button("Submit Race Prediction", type="primary", use_container_width=True):
-    chosen_list = list(selections.values())
-    empty_slots = [p for p, v in selections.items() if v == PLACEHOLDER]
-
-    if empty_slots:
-        st.markdown(render_toast(f"Missing: {', '.join(empty_slots)}. Fill every position.", "error"), unsafe_allow_html=True)
-    else:
-        dupes = {d for d in chosen_list if chosen_list.count(d) > 1}
-        if dupes:
-            st.markdown(render_toast(f"Duplicate drivers: {', '.join(sorted(dupes))}.", "error"), unsafe_allow_html=True)
-        else:
-            new_row = {"race": selected_race, "user": user, **selections}
-            upsert_race_prediction(new_row)
-            st.markdown(render_toast(f"Prediction for {selected_race} saved for {user}!", "success"), unsafe_allow_html=True)
+prediction_grid()
 
 # ---------------------------------------------------------------------------
 # Display predictions for selected race
@@ -154,12 +160,22 @@ if st.button("Submit Race Prediction", type="primary", use_container_width=True)
 st.markdown(render_divider(accent=True), unsafe_allow_html=True)
 st.markdown(render_section_header(f"Predictions — {selected_race}"), unsafe_allow_html=True)
 
-race_pred_df = load_race_predictions()
-filtered = race_pred_df[race_pred_df["race"] == selected_race]
+filtered = race_pred_df
 
 if filtered.empty:
     st.markdown(render_empty_state("No predictions yet for this race."), unsafe_allow_html=True)
 else:
+    # Scores, once the official result for this race has been imported
+    scores = score_predictions_by_id(
+        race_tables["race_prediction_ids"], race_tables["race_result_ids"], drivers_df["id"].astype(int).tolist()
+    )
+    if not scores.empty:
+        scores = scores.sort_values("points", ascending=False)
+        st.markdown(
+            render_stat_cards([(r.points, f"{r.user} · {r.exact} exact") for r in scores.itertuples()]),
+            unsafe_allow_html=True,
+        )
+
     for idx, (_, pred_row) in enumerate(filtered.iterrows()):
         pred_user = pred_row["user"]
 
@@ -204,3 +220,4 @@ else:
         st.markdown(render_divider(), unsafe_allow_html=True)
 
 st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
@@ -1,11 +1,19 @@
+import html
 import streamlit as st
 from datetime import date
-from utils.constants import USERS
-from utils.data_helpers import load_fun_predictions, insert_fun_prediction, delete_fun_prediction
+from utils.constants import FUN_PAGE_SIZE, USERS
+from utils.data_helpers import (
+    delete_fun_prediction,
+    insert_fun_prediction,
+    load_fun_prediction_page,
+    search_fun_predictions,
+)
 from utils.styles import inject_styles
+from utils.telemetry import finish_run, start_run
 from utils.ui_helpers import render_navbar, render_page_header, render_section_header, render_divider, render_footer, render_toast, render_empty_state
 
 st.set_page_config(page_title="Fun Predictions", page_icon="", layout="wide")
+start_run("fun")
 inject_styles()
 st.markdown(render_navbar("fun"), unsafe_allow_html=True)
 
@@ -50,28 +58,14 @@ if submit:
         st.markdown(render_toast("Prediction submitted!", "success"), unsafe_allow_html=True)
 
 # ---------------------------------------------------------------------------
-# Display all fun predictions (newest first, 3 across)
+# Cards
 # ---------------------------------------------------------------------------
-st.markdown(render_divider(accent=True), unsafe_allow_html=True)
-st.markdown(render_section_header("All Predictions"), unsafe_allow_html=True)
-
-df = load_fun_predictions()
-
-if df.empty:
-    st.markdown(render_empty_state("No fun predictions yet — drop your hot takes here."), unsafe_allow_html=True)
-else:
-    df_display = df.iloc[::-1].reset_index()
-    # Use Supabase 'id' if available, otherwise fall back to original DataFrame index
-    id_col = "id" if "id" in df.columns else "index"
-
-    rows_of_cards = [
-        df_display.iloc[i : i + 3] for i in range(0, len(df_display), 3)
-    ]
-
-    for card_row in rows_of_cards:
+def show_cards(cards: list[dict]) -> None:
+    """Render prediction cards 3 across, each with a delete button."""
+    for start in range(0, len(cards), 3):
         cols = st.columns(3)
-        for col_idx, (_, row) in enumerate(card_row.iterrows()):
-            with cols[col_idx]:
+        for col, row in zip(cols, cards[start : start + 3]):
+            with col:
                 st.markdown(
                     f"""
                     <div class="fun-card">
@@ -85,9 +79,57 @@ else:
                     unsafe_allow_html=True,
                 )
                 st.markdown('<div class="trash-btn">', unsafe_allow_html=True)
-                if st.button("Delete", key=f"del_fun_{row[id_col]}"):
-                    delete_fun_prediction(row[id_col])
+                if st.button("Delete", key=f"del_fun_{row['id']}"):
+                    delete_fun_prediction(row["id"])
                     st.rerun()
                 st.markdown("</div>", unsafe_allow_html=True)
 
+
+st.markdown(render_divider(accent=True), unsafe_allow_html=True)
+st.markdown(render_section_header("All Predictions"), unsafe_allow_html=True)
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+col_query, col_by = st.columns([2, 1])
+with col_query:
+    query = st.text_input("Search", placeholder="e.g. Bearman podium", key="fun_query")
+with col_by:
+    search_user = st.selectbox("Posted by", ["Everyone"] + USERS, key="fun_search_user")
+
+if query.strip():
+    results = search_fun_predictions(
+        query, user=None if search_user == "Everyone" else search_user
+    ).to_dict(orient="records")
+    if results:
+        show_cards(results)
+    else:
+        st.markdown(render_empty_state(f"No predictions match “{html.escape(query.strip())}”."), unsafe_allow_html=True)
+else:
+    # -----------------------------------------------------------------------
+    # Newest first, one page at a time
+    # -----------------------------------------------------------------------
+    # Each page is fetched by keyset (ids below the last one shown), so the
+    # cursors are recomputed every run and new or deleted posts never leave gaps.
+    pages_shown = st.session_state.setdefault("fun_pages", 1)
+    cards = []
+    has_more = False
+    before = None
+    for _ in range(pages_shown):
+        page = load_fun_prediction_page(before=before, limit=FUN_PAGE_SIZE)
+        has_more = len(page) > FUN_PAGE_SIZE
+        cards.extend(page.head(FUN_PAGE_SIZE).to_dict(orient="records"))
+        if not has_more:
+            break
+        before = cards[-1]["id"]
+
+    if not cards:
+        st.markdown(render_empty_state("No fun predictions yet — drop your hot takes here."), unsafe_allow_html=True)
+    else:
+        show_cards(cards)
+        if has_more and st.button("Load more", key="fun_load_more"):
+            st.session_state["fun_pages"] = pages_shown + 1
+            st.rerun()
+
 st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
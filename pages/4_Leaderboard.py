@@ -0,0 +1,65 @@
+import streamlit as st
+from utils.data_helpers import load_leaderboard, load_standings
+from utils.styles import inject_styles
+from utils.telemetry import finish_run, start_run
+from utils.ui_helpers import (
+    render_navbar,
+    render_page_header,
+    render_section_header,
+    render_divider,
+    render_standings,
+    render_footer,
+    render_empty_state,
+)
+
+st.set_page_config(page_title="Leaderboard", page_icon="", layout="wide")
+start_run("leaderboard")
+inject_styles()
+st.markdown(render_navbar("leaderboard"), unsafe_allow_html=True)
+
+# ---------------------------------------------------------------------------
+# Header
+# ---------------------------------------------------------------------------
+st.markdown(
+    render_page_header(
+        "Leaderboard",
+        "Race prediction points, updated as official results come in.",
+    ),
+    unsafe_allow_html=True,
+)
+
+# ---------------------------------------------------------------------------
+# Data — one read of the materialized leaderboard
+# ---------------------------------------------------------------------------
+leaderboard_df = load_leaderboard()
+
+if leaderboard_df.empty:
+    st.markdown(
+        render_empty_state("No scored races yet — standings appear once results are imported."),
+        unsafe_allow_html=True,
+    )
+else:
+    standings = load_standings()
+    latest_round = int(leaderboard_df["round"].max())
+
+    st.markdown(render_section_header("Standings"), unsafe_allow_html=True)
+    st.markdown(
+        render_standings(
+            list(zip(standings["user"], standings["cumulative"], standings["points"])),
+            f"Through Round {latest_round}",
+        ),
+        unsafe_allow_html=True,
+    )
+
+    st.markdown(render_divider(), unsafe_allow_html=True)
+    st.markdown(render_section_header("Points Progression"), unsafe_allow_html=True)
+    progression = (
+        leaderboard_df.pivot_table(index="round", columns="user", values="cumulative")
+        .sort_index()
+        .ffill()
+        .fillna(0)
+    )
+    st.line_chart(progression)
+
+st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
@@ -0,0 +1,174 @@
+import streamlit as st
+from utils.constants import CONSTRUCTOR_POSITIONS, DRIVER_POSITIONS, SIM_SAMPLES, USERS
+from utils.data_helpers import (
+    RACE_POSITIONS,
+    championship_outlook,
+    load_race_consensus,
+    load_season_consensus,
+    load_tables,
+    load_user_similarity,
+)
+from utils.similarity import METRICS
+from utils.styles import inject_styles
+from utils.telemetry import finish_run, start_run
+from utils.ui_helpers import (
+    render_navbar,
+    render_page_header,
+    render_section_header,
+    render_divider,
+    render_footer,
+    render_timing_tower,
+    render_empty_state,
+    driver_option_index,
+)
+
+st.set_page_config(page_title="Insights", page_icon="", layout="wide")
+start_run("insights")
+inject_styles()
+st.markdown(render_navbar("insights"), unsafe_allow_html=True)
+
+# ---------------------------------------------------------------------------
+# Header
+# ---------------------------------------------------------------------------
+st.markdown(
+    render_page_header(
+        "Insights",
+        "What everyone's picks imply for the championships.",
+    ),
+    unsafe_allow_html=True,
+)
+
+# ---------------------------------------------------------------------------
+# Championship simulator
+# ---------------------------------------------------------------------------
+st.markdown(render_section_header("Championship Simulator"), unsafe_allow_html=True)
+st.caption(
+    "Plays out every remaining race many times around the chosen user's race picks "
+    "(or their season order where they have no pick), on top of the results so far."
+)
+
+col_user, col_samples, col_run = st.columns([2, 2, 1], vertical_alignment="bottom")
+with col_user:
+    sim_user = st.selectbox("Picks of", USERS, key="sim_user")
+with col_samples:
+    sim_samples = st.select_slider(
+        "Seasons to simulate",
+        options=[10_000, 25_000, 50_000, SIM_SAMPLES],
+        value=SIM_SAMPLES,
+        format_func=lambda n: f"{n:,}",
+        key="sim_samples",
+    )
+with col_run:
+    run = st.button("Simulate", type="primary", use_container_width=True)
+
+# Results live in session state, so other widgets don't re-run the simulation.
+if run:
+    with st.spinner(f"Simulating {sim_samples:,} seasons..."):
+        st.session_state["sim_result"] = (sim_user, sim_samples, *championship_outlook(sim_user, samples=sim_samples))
+
+if "sim_result" in st.session_state:
+    shown_user, shown_samples, driver_table, team_table = st.session_state["sim_result"]
+    st.caption(f"{shown_user}'s picks · {shown_samples:,} simulated seasons")
+    formats = {
+        "Title %": st.column_config.NumberColumn(format="%.1f%%"),
+        "Exp. Position": st.column_config.NumberColumn(format="%.1f"),
+        "Exp. Points": st.column_config.NumberColumn(format="%.0f"),
+    }
+    col_drivers, col_teams = st.columns([3, 2])
+    with col_drivers:
+        st.markdown("**Drivers' Championship**")
+        st.dataframe(driver_table, hide_index=True, use_container_width=True, column_config=formats)
+    with col_teams:
+        st.markdown("**Constructors' Championship**")
+        st.dataframe(team_table, hide_index=True, use_container_width=True, column_config=formats)
+
+# ---------------------------------------------------------------------------
+# League consensus
+# ---------------------------------------------------------------------------
+st.markdown(render_divider(accent=True), unsafe_allow_html=True)
+st.markdown(render_section_header("League Consensus"), unsafe_allow_html=True)
+
+tables = load_tables("drivers", "races")
+driver_teams = driver_option_index(tables["drivers"]).teams
+
+col_scope, col_method = st.columns([2, 2])
+with col_scope:
+    scope = st.selectbox("Consensus for", ["Season"] + tables["races"]["Race Name"].tolist(), key="consensus_scope")
+with col_method:
+    method = st.radio("Method", ["Kemeny", "Borda"], horizontal=True, key="consensus_method")
+st.caption(
+    "Kemeny finds the order that disagrees with the fewest head-to-head picks across the league; "
+    "Borda ranks by head-to-head wins."
+)
+column = method.lower()
+
+
+def consensus_tower(consensus, positions: list[str], label: str) -> str:
+    return render_timing_tower(
+        user="League Consensus",
+        positions=positions,
+        pos_values=dict(zip(consensus["position"], consensus[column])),
+        driver_teams=driver_teams,
+        championship_label=label,
+    )
+
+
+if scope == "Season":
+    drivers_consensus = load_season_consensus(championship="drivers")
+    if drivers_consensus.empty:
+        st.markdown(render_empty_state("No season predictions yet."), unsafe_allow_html=True)
+    else:
+        col_drivers, col_teams = st.columns(2)
+        with col_drivers:
+            st.markdown(consensus_tower(drivers_consensus, DRIVER_POSITIONS, "Drivers"), unsafe_allow_html=True)
+        with col_teams:
+            constructors_consensus = load_season_consensus(championship="constructors")
+            st.markdown(
+                consensus_tower(constructors_consensus, CONSTRUCTOR_POSITIONS, "Constructors"), unsafe_allow_html=True
+            )
+else:
+    race_consensus = load_race_consensus(race=scope)
+    if race_consensus.empty:
+        st.markdown(render_empty_state("No predictions yet for this race."), unsafe_allow_html=True)
+    else:
+        col_tower, _ = st.columns([1, 1])
+        with col_tower:
+            st.markdown(consensus_tower(race_consensus, RACE_POSITIONS, "Race Result"), unsafe_allow_html=True)
+
+# ---------------------------------------------------------------------------
+# Head to head
+# ---------------------------------------------------------------------------
+st.markdown(render_divider(accent=True), unsafe_allow_html=True)
+st.markdown(render_section_header("Head to Head"), unsafe_allow_html=True)
+
+# One cached matrix for every pair of users; this section only slices it.
+similarity = load_user_similarity()
+
+if len(similarity.users) < 2:
+    st.markdown(render_empty_state("Head-to-head needs predictions from at least two users."), unsafe_allow_html=True)
+else:
+    col_metric, col_who = st.columns([2, 2])
+    with col_metric:
+        metric = st.radio(
+            "Measure", list(METRICS), format_func=METRICS.get, horizontal=True, key="similarity_metric"
+        )
+    with col_who:
+        who = st.selectbox("Closest to", similarity.users, key="similarity_user")
+    st.caption(
+        "Across every race and both season championships. Kendall tau compares every pair of picks "
+        "(1 = same order, -1 = reversed); footrule compares positions; top-k overlap counts shared "
+        "picks at the front."
+    )
+
+    number = st.column_config.NumberColumn(format="%.2f")
+    if len(similarity.users) <= 12:
+        st.dataframe(similarity.frame(metric), use_container_width=True, column_config={u: number for u in similarity.users})
+    st.dataframe(
+        similarity.most_similar(who, metric),
+        hide_index=True,
+        use_container_width=True,
+        column_config={METRICS[metric]: number},
+    )
+
+st.markdown(render_footer(), unsafe_allow_html=True)
+finish_run()
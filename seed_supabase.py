@@ -1,18 +1,32 @@
 """Seed Supabase tables with CSV reference data.
 
 Reads credentials from .streamlit/secrets.toml and uploads drivers,
-constructors, and races data from the data/ directory into Supabase.
+constructors, races, predictions and race results from the data/ directory
+into Supabase.
+
+Only rows that are new or changed are sent: existing keys are fetched
+first and compared with the CSV, so re-running on a populated project
+writes nothing. Uploads go out in bounded chunks, several at a time.
+Fun predictions have no natural key and are matched on
+(user, prediction, date_created), so they are never duplicated. When
+race predictions or results change, the leaderboard is rebuilt to match.
 
 Usage:
-    python seed_supabase.py
+    python seed_supabase.py [--dry-run] [--chunk-size 500] [--workers 4]
 """
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 import pandas as pd
 
+from utils.constants import BATCH_WRITE_SIZE, CONSTRUCTOR_POSITIONS, DRIVER_POSITIONS, NUM_DRIVERS
+from utils.encoding import encode_ordering
+
 # ---------------------------------------------------------------------------
 # Read Supabase credentials from .streamlit/secrets.toml
 # ---------------------------------------------------------------------------
@@ -42,68 +56,204 @@ from supabase import create_client
 
 sb = create_client(url, key)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+RACE_POSITIONS = [f"P{i}" for i in range(1, NUM_DRIVERS + 1)]
+
 
 # ---------------------------------------------------------------------------
-# Helper
+# Tables
 # ---------------------------------------------------------------------------
 
-def upsert_table(table_name: str, df: pd.DataFrame, conflict_col: str) -> None:
-    """Upsert a DataFrame into a Supabase table."""
-    rows = df.to_dict(orient="records")
-    if not rows:
-        print(f"  ⚠️  {table_name}: no data to upload")
-        return
-    resp = sb.table(table_name).upsert(rows, on_conflict=conflict_col).execute()
-    print(f"  ✅ {table_name}: upserted {len(rows)} rows")
+@dataclass
+class SeedTable:
+    name: str
+    csv: str
+    keys: list[str]
+    columns: dict[str, str] = field(default_factory=dict)  # CSV header -> column
+    upsert: bool = True  # False: insert missing rows only (no unique key to upsert on)
+
+
+REFERENCE_TABLES = [
+    SeedTable("drivers", "drivers.csv", ["driver_name"], {
+        "Driver Name": "driver_name", "Driver Number": "driver_number", "Driver Team": "driver_team",
+    }),
+    SeedTable("constructors", "constructors.csv", ["team_name"], {
+        "Team Name": "team_name", "Team Color": "team_color",
+    }),
+    SeedTable("races", "races.csv", ["round_number"], {
+        "Round Number": "round_number", "Race Name": "race_name", "Race Date": "race_date",
+    }),
+]
+
+PREDICTION_TABLES = [
+    SeedTable("season_predictions", "season_predictions.csv", ["user"]),
+    SeedTable("race_predictions", "race_predictions.csv", ["race", "user"]),
+    SeedTable("race_results", "race_results.csv", ["race"]),
+    SeedTable("fun_predictions", "fun_predictions.csv", ["user", "prediction", "date_created"], upsert=False),
+]
 
 
 # ---------------------------------------------------------------------------
-# Seed reference data
+# Helpers
 # ---------------------------------------------------------------------------
-print("Seeding reference data...")
 
-# Drivers
-drivers = pd.read_csv(os.path.join(DATA_DIR, "drivers.csv"))
-drivers.columns = ["driver_name", "driver_number", "driver_team"]
-upsert_table("drivers", drivers, "driver_name")
+def _norm(value: object) -> str | None:
+    """Compare CSV text and database values on equal terms."""
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value == "":
+        return None
+    return str(value)
+
+
+def read_csv(table: SeedTable) -> pd.DataFrame:
+    df = pd.read_csv(os.path.join(DATA_DIR, table.csv), dtype=str)
+    return df.rename(columns=table.columns)
+
+
+def fetch_all(table: str, columns: list[str]) -> list[dict]:
+    """Every row's *columns*, paged past the row cap."""
+    rows: list[dict] = []
+    while True:
+        resp = (
+            sb.table(table)
+            .select(",".join(columns))
+            .order("id")  # stable order, so pages neither overlap nor skip rows
+            .range(len(rows), len(rows) + PAGE_SIZE - 1)
+            .execute()
+        )
+        rows.extend(resp.data or [])
+        if len(resp.data or []) < PAGE_SIZE:
+            return rows
+
+
+def fetch_existing(table: str, columns: list[str]) -> set[tuple]:
+    """Existing rows as normalized value tuples."""
+    return {tuple(_norm(r[c]) for c in columns) for r in fetch_all(table, columns)}
+
+
+def diff_rows(table: SeedTable, df: pd.DataFrame) -> tuple[list[dict], int, int]:
+    """Return ``(rows to send, new count, changed count)``."""
+    # Key columns first, so a row's key is a prefix of its value tuple.
+    columns = table.keys + [c for c in df.columns if c not in table.keys]
+    existing = fetch_existing(table.name, columns)
+    existing_keys = {row[: len(table.keys)] for row in existing}
+    send: list[dict] = []
+    new = changed = 0
+    for row in df.to_dict(orient="records"):
+        values = tuple(_norm(row[c]) for c in columns)
+        if values in existing:
+            continue
+        if table.upsert and values[: len(table.keys)] in existing_keys:
+            changed += 1
+        else:
+            new += 1
+        send.append({c: row[c] if _norm(row[c]) is not None else None for c in columns})
+    return send, new, changed
+
+
+def with_ids(table: str, rows: list[dict], driver_ids: dict[str, int], constructor_ids: dict[str, int]) -> list[dict]:
+    """Add the compact id arrays the app reads (see utils/encoding.py)."""
+    if table in ("race_predictions", "race_results"):
+        return [{**r, "p_ids": encode_ordering([r.get(p) for p in RACE_POSITIONS], driver_ids)} for r in rows]
+    if table == "season_predictions":
+        return [
+            {
+                **r,
+                "d_ids": encode_ordering([r.get(p) for p in DRIVER_POSITIONS], driver_ids),
+                "c_ids": encode_ordering([r.get(p) for p in CONSTRUCTOR_POSITIONS], constructor_ids),
+            }
+            for r in rows
+        ]
+    return rows
+
 
-# Constructors
-constructors = pd.read_csv(os.path.join(DATA_DIR, "constructors.csv"))
-constructors.columns = ["team_name", "team_color"]
-upsert_table("constructors", constructors, "team_name")
+def with_versions(rows: list[dict]) -> list[dict]:
+    """Bump each season prediction's ``version`` past the stored one.
+
+    Sessions still editing an overwritten prediction then get a version
+    conflict on their next save instead of silently undoing the seed.
+    """
+    versions = {r["user"]: int(r["version"]) for r in fetch_all("season_predictions", ["user", "version"])}
+    return [{**r, "version": versions.get(r["user"], 0) + 1} for r in rows]
+
+
+def send_chunks(pool: ThreadPoolExecutor, table: SeedTable, rows: list[dict], chunk_size: int) -> None:
+    def send(chunk: list[dict]) -> None:
+        query = sb.table(table.name)
+        if table.upsert:
+            query.upsert(chunk, on_conflict=",".join(table.keys)).execute()
+        else:
+            query.insert(chunk).execute()
+
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    for future in [pool.submit(send, c) for c in chunks]:
+        future.result()
+
+
+def seed(tables: list[SeedTable], pool: ThreadPoolExecutor, args: argparse.Namespace, ids: tuple | None = None) -> set[str]:
+    """Seed *tables*; return the names of those that had rows sent."""
+    written: set[str] = set()
+    for table in tables:
+        df = read_csv(table)
+        if df.empty:
+            print(f"  ⏭  {table.name}: CSV is empty, skipping")
+            continue
+        rows, new, changed = diff_rows(table, df)
+        unchanged = len(df) - len(rows)
+        summary = f"{new} new, {changed} changed, {unchanged} unchanged"
+        if not rows:
+            print(f"  ✅ {table.name}: up to date ({unchanged} rows)")
+        elif args.dry_run:
+            print(f"  ⏭  {table.name}: would send {len(rows)} rows ({summary})")
+        else:
+            if ids is not None:
+                rows = with_ids(table.name, rows, *ids)
+            if table.name == "season_predictions":
+                rows = with_versions(rows)
+            send_chunks(pool, table, rows, args.chunk_size)
+            written.add(table.name)
+            print(f"  ✅ {table.name}: sent {len(rows)} rows ({summary})")
+    return written
+
+
+def id_maps() -> tuple[dict[str, int], dict[str, int]]:
+    drivers = sb.table("drivers").select("id,driver_name").execute().data or []
+    constructors = sb.table("constructors").select("id,team_name").execute().data or []
+    return (
+        {d["driver_name"]: int(d["id"]) for d in drivers},
+        {c["team_name"]: int(c["id"]) for c in constructors},
+    )
 
-# Races
-races = pd.read_csv(os.path.join(DATA_DIR, "races.csv"))
-races.columns = ["round_number", "race_name", "race_date"]
-upsert_table("races", races, "round_number")
 
 # ---------------------------------------------------------------------------
-# Seed prediction data (if any rows exist in CSVs)
+# Main
 # ---------------------------------------------------------------------------
-print("\nSeeding prediction data...")
-
-# Season predictions
-sp = pd.read_csv(os.path.join(DATA_DIR, "season_predictions.csv"))
-if not sp.empty:
-    upsert_table("season_predictions", sp, "user")
-else:
-    print("  ⏭  season_predictions: CSV is empty, skipping")
-
-# Race predictions
-rp = pd.read_csv(os.path.join(DATA_DIR, "race_predictions.csv"))
-if not rp.empty:
-    upsert_table("race_predictions", rp, "race,user")
-else:
-    print("  ⏭  race_predictions: CSV is empty, skipping")
-
-# Fun predictions
-fp = pd.read_csv(os.path.join(DATA_DIR, "fun_predictions.csv"))
-if not fp.empty:
-    # Fun predictions are append-only; insert new ones
-    rows = fp.to_dict(orient="records")
-    sb.table("fun_predictions").insert(rows).execute()
-    print(f"  ✅ fun_predictions: inserted {len(rows)} rows")
-else:
-    print("  ⏭  fun_predictions: CSV is empty, skipping")
-
-print("\n✅ Done! Your data is now in Supabase.")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report what would change, write nothing")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_WRITE_SIZE, help="rows per request")
+    parser.add_argument("--workers", type=int, default=4, help="requests in flight at once")
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        print("Seeding reference data...")
+        seed(REFERENCE_TABLES, pool, args)
+
+        print("\nSeeding prediction data...")
+        written = seed(PREDICTION_TABLES, pool, args, ids=id_maps())
+
+    if written & {"race_predictions", "race_results"}:
+        # Bulk seeding skips the per-race leaderboard refresh the app's writers do.
+        from utils.data_helpers import rebuild_leaderboard
+
+        print(f"\n  ✅ leaderboard: rebuilt ({rebuild_leaderboard()} rows)")
+
+    if args.dry_run:
+        print("\nDry run: nothing was written.")
+    else:
+        print("\n✅ Done! Your data is now in Supabase.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
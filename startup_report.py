@@ -0,0 +1,96 @@
+"""Measure cold-start time, stage by stage, to catch regressions.
+
+Runs in a fresh process and times: heavy imports, storage client
+construction, the cache warm-up (per table, cold), the same reads warm, and
+the first Home.py render (Streamlit AppTest). Save a run with ``--json`` and
+compare later runs against it with ``--baseline``; a stage slower than the
+baseline by more than ``--tolerance`` (and at least 20 ms) fails the run.
+
+Usage:
+    python startup_report.py [--json report.json] [--baseline report.json] [--tolerance 0.25]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# This script runs the warm-up itself, in the foreground.
+os.environ["WARM_UP"] = "0"
+
+MIN_REGRESSION_MS = 20.0
+
+
+def measure() -> dict[str, float]:
+    stages: dict[str, float] = {}
+
+    def stage(name: str, fn) -> None:
+        t0 = time.perf_counter()
+        fn()
+        stages[name] = (time.perf_counter() - t0) * 1000
+
+    stage("import streamlit", lambda: __import__("streamlit"))
+    stage("import pandas", lambda: __import__("pandas"))
+    stage("import utils.data_helpers", lambda: __import__("utils.data_helpers"))
+
+    from utils import data_helpers
+    from utils.db import get_client
+
+    stage("storage client", get_client)
+    t0 = time.perf_counter()
+    cold = data_helpers.warm_up()
+    stages["warm-up (parallel)"] = (time.perf_counter() - t0) * 1000
+    for table, seconds in cold.items():
+        stages[f"  {table} (cold)"] = seconds * 1000
+    stage("warm re-read", lambda: [data_helpers._LOADERS[t]() for t in data_helpers.WARM_UP_TABLES])
+
+    from streamlit.testing.v1 import AppTest
+
+    home = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Home.py")
+    stage("Home.py first render", lambda: AppTest.from_file(home, default_timeout=60).run())
+    stages["total"] = sum(v for k, v in stages.items() if not k.startswith("  "))
+    return stages
+
+
+def regressions(stages: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    out = []
+    for name, ms in stages.items():
+        before = baseline.get(name)
+        if before is not None and ms - before > max(MIN_REGRESSION_MS, before * tolerance):
+            out.append(f"{name.strip()}: {before:.0f} ms -> {ms:.0f} ms")
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", metavar="PATH", help="write this run's stage timings")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage (fraction)")
+    args = parser.parse_args()
+
+    stages = measure()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'stage':<36} {'ms':>9} {'baseline':>9}")
+    print("-" * 56)
+    for name, ms in stages.items():
+        before = f"{baseline[name]:>9.1f}" if name in baseline else f"{'':>9}"
+        print(f"{name:<36} {ms:>9.1f} {before}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stages, f, indent=2)
+
+    slower = regressions(stages, baseline, args.tolerance)
+    for line in slower:
+        print(f"  ⚠ regression: {line}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
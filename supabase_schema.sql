@@ -37,9 +37,13 @@ CREATE TABLE IF NOT EXISTS season_predictions (
     "D21" TEXT, "D22" TEXT,
     "C1"  TEXT, "C2"  TEXT, "C3"  TEXT, "C4"  TEXT, "C5"  TEXT,
     "C6"  TEXT, "C7"  TEXT, "C8"  TEXT, "C9"  TEXT, "C10" TEXT,
-    "C11" TEXT
+    "C11" TEXT,
+    version INT NOT NULL DEFAULT 1  -- bumped on every save (optimistic concurrency)
 );
 
+-- Upgrade path for projects created before the version column existed
+ALTER TABLE season_predictions ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 1;
+
 -- Race Predictions (one row per user + race)
 CREATE TABLE IF NOT EXISTS race_predictions (
     id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -53,6 +57,31 @@ CREATE TABLE IF NOT EXISTS race_predictions (
     UNIQUE (race, "user")
 );
 
+-- Actual race results (one row per race, same P1..P22 layout as predictions)
+CREATE TABLE IF NOT EXISTS race_results (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    race TEXT NOT NULL UNIQUE,
+    "P1"  TEXT, "P2"  TEXT, "P3"  TEXT, "P4"  TEXT, "P5"  TEXT,
+    "P6"  TEXT, "P7"  TEXT, "P8"  TEXT, "P9"  TEXT, "P10" TEXT,
+    "P11" TEXT, "P12" TEXT, "P13" TEXT, "P14" TEXT, "P15" TEXT,
+    "P16" TEXT, "P17" TEXT, "P18" TEXT, "P19" TEXT, "P20" TEXT,
+    "P21" TEXT, "P22" TEXT
+);
+
+-- Materialized leaderboard: points per user per scored race. Maintained
+-- incrementally by the app; running totals are summed when read.
+CREATE TABLE IF NOT EXISTS leaderboard (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    "user" TEXT NOT NULL,
+    race TEXT NOT NULL,
+    round INT NOT NULL,
+    points INT NOT NULL DEFAULT 0,
+    UNIQUE ("user", race)
+);
+-- Earlier versions stored a running total here; it is no longer written.
+ALTER TABLE leaderboard DROP COLUMN IF EXISTS cumulative;
+CREATE INDEX IF NOT EXISTS leaderboard_round_idx ON leaderboard (round, "user");
+
 -- Fun Predictions (append-only, one row per prediction)
 CREATE TABLE IF NOT EXISTS fun_predictions (
     id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
@@ -61,6 +90,48 @@ CREATE TABLE IF NOT EXISTS fun_predictions (
     date_created TEXT NOT NULL
 );
 
+-- -------------------------------------------------------------------------
+-- Compact orderings: each ordering as a smallint[] of reference ids
+-- (drivers.id / constructors.id, 0 = empty slot). Written alongside the
+-- name columns by the app; the UPDATEs backfill rows saved before.
+-- -------------------------------------------------------------------------
+ALTER TABLE season_predictions ADD COLUMN IF NOT EXISTS d_ids SMALLINT[];
+ALTER TABLE season_predictions ADD COLUMN IF NOT EXISTS c_ids SMALLINT[];
+ALTER TABLE race_predictions   ADD COLUMN IF NOT EXISTS p_ids SMALLINT[];
+ALTER TABLE race_results       ADD COLUMN IF NOT EXISTS p_ids SMALLINT[];
+
+UPDATE race_predictions t SET p_ids = ARRAY(
+    SELECT COALESCE(d.id, 0) FROM unnest(ARRAY[
+        t."P1", t."P2", t."P3", t."P4", t."P5", t."P6", t."P7", t."P8", t."P9", t."P10", t."P11",
+        t."P12", t."P13", t."P14", t."P15", t."P16", t."P17", t."P18", t."P19", t."P20", t."P21", t."P22"
+    ]) WITH ORDINALITY AS s(name, ord)
+    LEFT JOIN drivers d ON d.driver_name = s.name ORDER BY s.ord
+)::SMALLINT[] WHERE p_ids IS NULL;
+
+UPDATE race_results t SET p_ids = ARRAY(
+    SELECT COALESCE(d.id, 0) FROM unnest(ARRAY[
+        t."P1", t."P2", t."P3", t."P4", t."P5", t."P6", t."P7", t."P8", t."P9", t."P10", t."P11",
+        t."P12", t."P13", t."P14", t."P15", t."P16", t."P17", t."P18", t."P19", t."P20", t."P21", t."P22"
+    ]) WITH ORDINALITY AS s(name, ord)
+    LEFT JOIN drivers d ON d.driver_name = s.name ORDER BY s.ord
+)::SMALLINT[] WHERE p_ids IS NULL;
+
+UPDATE season_predictions t SET
+    d_ids = ARRAY(
+        SELECT COALESCE(d.id, 0) FROM unnest(ARRAY[
+            t."D1", t."D2", t."D3", t."D4", t."D5", t."D6", t."D7", t."D8", t."D9", t."D10", t."D11",
+            t."D12", t."D13", t."D14", t."D15", t."D16", t."D17", t."D18", t."D19", t."D20", t."D21", t."D22"
+        ]) WITH ORDINALITY AS s(name, ord)
+        LEFT JOIN drivers d ON d.driver_name = s.name ORDER BY s.ord
+    )::SMALLINT[],
+    c_ids = ARRAY(
+        SELECT COALESCE(c.id, 0) FROM unnest(ARRAY[
+            t."C1", t."C2", t."C3", t."C4", t."C5", t."C6", t."C7", t."C8", t."C9", t."C10", t."C11"
+        ]) WITH ORDINALITY AS s(name, ord)
+        LEFT JOIN constructors c ON c.team_name = s.name ORDER BY s.ord
+    )::SMALLINT[]
+WHERE d_ids IS NULL OR c_ids IS NULL;
+
 -- Disable Row Level Security (trusted friends-only app)
 ALTER TABLE drivers              DISABLE ROW LEVEL SECURITY;
 ALTER TABLE constructors         DISABLE ROW LEVEL SECURITY;
@@ -68,10 +139,29 @@ ALTER TABLE races                DISABLE ROW LEVEL SECURITY;
 ALTER TABLE season_predictions   DISABLE ROW LEVEL SECURITY;
 ALTER TABLE race_predictions     DISABLE ROW LEVEL SECURITY;
 ALTER TABLE fun_predictions      DISABLE ROW LEVEL SECURITY;
+ALTER TABLE race_results         DISABLE ROW LEVEL SECURITY;
+ALTER TABLE leaderboard          DISABLE ROW LEVEL SECURITY;
 
 -- Grant write access to anon role (used by the publishable/anon key)
 GRANT INSERT, UPDATE, DELETE ON season_predictions TO anon;
 GRANT INSERT, UPDATE, DELETE ON race_predictions   TO anon;
 GRANT INSERT, UPDATE, DELETE ON fun_predictions    TO anon;
+GRANT INSERT, UPDATE, DELETE ON race_results       TO anon;
+GRANT INSERT, UPDATE, DELETE ON leaderboard        TO anon;
 GRANT USAGE ON ALL SEQUENCES IN SCHEMA public TO anon;
 
+
+-- Realtime change feed: the app patches its read cache from row changes
+-- instead of reloading whole tables. Safe to re-run.
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['season_predictions', 'race_predictions', 'race_results', 'fun_predictions', 'leaderboard'] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = t
+        ) THEN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE public.%I', t);
+        END IF;
+    END LOOP;
+END $$;
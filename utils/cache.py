@@ -0,0 +1,143 @@
+"""Process-wide read cache for the data layer."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TableCache:
+    """Bounded LRU cache keyed by ``(table, params)`` with per-table TTLs.
+
+    Entries are shared by every Streamlit session in the process. Writers call
+    :meth:`invalidate` with the table they touched, which drops every cached
+    variant of that table regardless of the parameters it was loaded with.
+    A change feed can instead :meth:`patch` entries row by row.
+
+    Concurrent misses on the same key share one load: later callers wait for
+    the first one instead of issuing the same query again. Each table has a
+    generation that :meth:`invalidate` and :meth:`patch` bump; a load that
+    overlaps a bump may have read the table before the change, so its
+    result is discarded and the load retried rather than stored.
+    """
+
+    MAX_LOAD_ATTEMPTS = 3
+
+    def __init__(self, ttls: dict[str, float], default_ttl: float, max_entries: int) -> None:
+        self._ttls = dict(ttls)
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[tuple[str, Hashable], threading.Event] = {}
+        self._generations: dict[str, int] = {}
+        self._epoch = 0  # bumped by invalidate(None), which covers every table
+        self._hits: dict[str, int] = {}
+        self._misses: dict[str, int] = {}
+        self._invalidations: dict[str, int] = {}
+
+    def ttl_for(self, table: str) -> float:
+        return self._ttls.get(table, self._default_ttl)
+
+    def set_ttl(self, table: str, ttl: float) -> None:
+        """Change *table*'s TTL for entries loaded from now on."""
+        with self._lock:
+            self._ttls[table] = ttl
+
+    def _generation(self, table: str) -> tuple[int, int]:
+        return self._epoch, self._generations.get(table, 0)
+
+    def _bump(self, table: str) -> None:
+        self._generations[table] = self._generations.get(table, 0) + 1
+
+    def get_or_load(self, table: str, params: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``(table, params)``, loading it on a miss."""
+        key = (table, params)
+        attempts = 0
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits[table] = self._hits.get(table, 0) + 1
+                    return entry[1]
+                pending = self._loading.get(key)
+                if pending is None:
+                    self._misses[table] = self._misses.get(table, 0) + 1
+                    done = self._loading[key] = threading.Event()
+                    generation = self._generation(table)
+            if pending is not None:
+                # Another thread is loading this key; use its result (or retry if it failed).
+                pending.wait()
+                continue
+
+            attempts += 1
+            try:
+                value = loader()
+                with self._lock:
+                    stale = self._generation(table) != generation
+                    if not stale:
+                        self._entries[key] = (time.monotonic() + self.ttl_for(table), value)
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self._max_entries:
+                            self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    del self._loading[key]
+                done.set()
+            # The table changed mid-load, so the result may predate the change.
+            # Under a steady stream of changes, hand back the last load uncached.
+            if not stale or attempts >= self.MAX_LOAD_ATTEMPTS:
+                return value
+
+    def invalidate(self, table: str | None = None) -> None:
+        """Drop every entry for *table*, or the whole cache when *table* is None."""
+        with self._lock:
+            if table is None:
+                self._entries.clear()
+                self._epoch += 1
+                return
+            for key in [k for k in self._entries if k[0] == table]:
+                del self._entries[key]
+            self._bump(table)
+            self._invalidations[table] = self._invalidations.get(table, 0) + 1
+
+    def patch(self, table: str, fn: Callable[[Hashable, Any], Any]) -> None:
+        """Replace each *table* entry with ``fn(params, value)``; ``None`` drops it.
+
+        Patched entries keep their expiry time. *fn* runs under the cache lock,
+        so it must be quick and must not call back into the cache.
+        """
+        with self._lock:
+            self._bump(table)  # loads in flight predate this change
+            for key in [k for k in self._entries if k[0] == table]:
+                expires, value = self._entries[key]
+                new = fn(key[1], value)
+                if new is None:
+                    del self._entries[key]
+                else:
+                    self._entries[key] = (expires, new)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return hit/miss/invalidation counters and live entry counts per table."""
+        with self._lock:
+            tables = set(self._hits) | set(self._misses) | set(self._invalidations)
+            sizes: dict[str, int] = {}
+            for table, _ in self._entries:
+                sizes[table] = sizes.get(table, 0) + 1
+            return {
+                table: {
+                    "hits": self._hits.get(table, 0),
+                    "misses": self._misses.get(table, 0),
+                    "invalidations": self._invalidations.get(table, 0),
+                    "entries": sizes.get(table, 0),
+                }
+                for table in sorted(tables)
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+            self._invalidations.clear()
@@ -0,0 +1,128 @@
+"""Row-change notifications for the read cache.
+
+Two sources emit the same :class:`ChangeEvent`:
+
+* :class:`RealtimeChangeFeed` — Supabase Realtime ``postgres_changes``
+  over a websocket, run on a background thread. It sees every writer.
+* :class:`ChangeFeed` — the in-process stand-in the SQLite backend
+  publishes its committed writes to. Writers in other processes (e.g. the
+  CLI importers) are not seen, so cached reads keep their normal TTLs.
+
+Besides row events, a feed emits ``RESYNC`` for a table when cached copies
+should simply be reloaded: after (re)connecting, since changes may have been
+missed, or for a write too large to patch row by row. ``LOST`` means the
+connection dropped.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+INSERT, UPDATE, DELETE = "INSERT", "UPDATE", "DELETE"
+RESYNC, LOST = "RESYNC", "LOST"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    table: str
+    type: str
+    record: dict[str, Any] = field(default_factory=dict)      # new row (INSERT/UPDATE)
+    old_record: dict[str, Any] = field(default_factory=dict)  # at least ``id`` (UPDATE/DELETE)
+
+
+class ChangeFeed:
+    """In-process publish/subscribe of :class:`ChangeEvent`."""
+
+    # True when every writer's changes reach this feed.
+    complete = False
+    # True when events are delivered before the write call returns.
+    synchronous = True
+
+    def __init__(self) -> None:
+        self._subscribers: list[Callable[[ChangeEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish(self, event: ChangeEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("change feed subscriber failed on %s %s", event.type, event.table)
+
+    def start(self, tables: list[str]) -> None:
+        """Begin delivering events for *tables* (no-op for the in-process feed)."""
+
+
+class RealtimeChangeFeed(ChangeFeed):
+    """Supabase Realtime ``postgres_changes`` for *tables*, on a daemon thread.
+
+    Tables must be in the ``supabase_realtime`` publication (see
+    ``supabase_schema.sql``).
+    """
+
+    complete = True
+    synchronous = False
+
+    def __init__(self, url: str, key: str) -> None:
+        super().__init__()
+        self._url = url.rstrip("/") + "/realtime/v1"
+        self._key = key
+        self._tables: list[str] = []
+        self._live = False
+        self._thread: threading.Thread | None = None
+
+    def start(self, tables: list[str]) -> None:
+        if self._thread is not None:
+            return
+        self._tables = list(tables)
+        self._thread = threading.Thread(target=self._run, name="f1-realtime", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._listen())
+        except Exception:
+            logger.exception("realtime change feed stopped")
+            self._set_live(False)
+
+    async def _listen(self) -> None:
+        from realtime import AsyncRealtimeClient  # type: ignore[import-untyped]
+
+        client = AsyncRealtimeClient(self._url, token=self._key, params={"apikey": self._key}, auto_reconnect=True)
+        channel = client.channel("f1-cache")
+        for table in self._tables:
+            channel.on_postgres_changes("*", self._on_change, table=table)
+        await channel.subscribe(self._on_state)
+        await asyncio.Event().wait()  # the client's own tasks deliver callbacks
+
+    def _on_change(self, payload: dict) -> None:
+        data = payload.get("data", payload)
+        self.publish(ChangeEvent(
+            table=data["table"],
+            type=data["type"],
+            record=data.get("record") or {},
+            old_record=data.get("old_record") or {},
+        ))
+
+    def _on_state(self, state: Any, error: Exception | None = None) -> None:
+        if error is not None:
+            logger.warning("realtime subscription error: %s", error)
+        self._set_live(str(getattr(state, "value", state)) == "SUBSCRIBED")
+
+    def _set_live(self, live: bool) -> None:
+        if live == self._live:
+            return
+        self._live = live
+        for table in self._tables:
+            self.publish(ChangeEvent(table, RESYNC if live else LOST))
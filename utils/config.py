@@ -0,0 +1,14 @@
+"""Runtime settings read from Streamlit secrets, falling back to the environment."""
+from __future__ import annotations
+
+import os
+
+import streamlit as st
+
+
+def get_setting(name: str, default: str | None = None) -> str | None:
+    """Return *name* from ``st.secrets``, then ``os.environ``, else *default*."""
+    try:
+        return st.secrets[name]
+    except (KeyError, FileNotFoundError):
+        return os.environ.get(name, default)
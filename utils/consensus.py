@@ -0,0 +1,116 @@
+"""League consensus orderings by rank aggregation.
+
+Every method works from one pairwise-preference matrix, built once per
+set of orderings in a single NumPy pass:
+
+* ``pairwise_preferences`` orderings -> ``W[a, b]`` = voters ranking *a* above *b*
+* ``borda``                W -> order by pairwise wins (Borda count)
+* ``kemeny``               W -> order with the fewest pairwise disagreements
+
+Kemeny is exact (dynamic programming over subsets) up to
+``KEMENY_EXACT_MAX`` items and otherwise starts from the Borda order and
+improves it by moving single items while that removes disagreements.
+Building W costs ``O(voters × items²)``; nothing after it depends on the
+number of voters.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from utils.scoring import finishing_positions
+
+KEMENY_EXACT_MAX = 12
+
+
+def pairwise_preferences(orderings: np.ndarray, n_items: int) -> np.ndarray:
+    """``W[a, b]``: how many orderings rank *a* above *b*.
+
+    *orderings* is ``(voters, slots)`` of item indices (``-1`` for an empty
+    slot), as from ``utils.encoding.ids_to_orderings``. An item a voter left
+    out ranks below everything they picked; two left-out items are a tie.
+    """
+    if len(orderings) == 0:
+        return np.zeros((n_items, n_items), dtype=np.int32)
+    positions = finishing_positions(orderings, n_items).astype(np.int32)
+    positions[positions == 0] = n_items + 1
+    above = positions[:, :, None] < positions[:, None, :]
+    return above.sum(0, dtype=np.int32)
+
+
+def disagreements(order: list[int], prefs: np.ndarray) -> int:
+    """Pairwise votes *order* goes against (the Kemeny distance it is minimizing)."""
+    idx = np.asarray(order)
+    lower = np.tril(prefs[np.ix_(idx, idx)], -1)  # later item preferred over an earlier one
+    return int(lower.sum())
+
+
+def borda(prefs: np.ndarray) -> list[int]:
+    """Items by pairwise wins, most first (ties by index)."""
+    wins = prefs.sum(1)
+    return sorted(range(len(wins)), key=lambda a: (-wins[a], a))
+
+
+def _kemeny_exact(prefs: np.ndarray) -> list[int]:
+    n = len(prefs)
+    # cost[a][S]: votes for a over the items in bitmask S (placed above a).
+    cost = []
+    for a in range(n):
+        row = np.zeros(1, dtype=np.int64)
+        for b in range(n):
+            row = np.concatenate([row, row + prefs[a, b]])
+        cost.append(row)
+
+    full = (1 << n) - 1
+    cost = [row.tolist() for row in cost]  # plain lists: the loop below is scalar work
+    best = [0] + [None] * full
+    last = [0] * (full + 1)
+    for placed in range(full):
+        base = best[placed]
+        for a in range(n):
+            bit = 1 << a
+            if placed & bit:
+                continue
+            total = base + cost[a][placed]
+            current = best[placed | bit]
+            if current is None or total < current:
+                best[placed | bit] = total
+                last[placed | bit] = a
+
+    order = []
+    placed = full
+    while placed:
+        a = int(last[placed])
+        order.append(a)
+        placed ^= 1 << a
+    return order[::-1]
+
+
+def _kemeny_local(prefs: np.ndarray, start: list[int]) -> list[int]:
+    order = list(start)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order)):
+            item = order.pop(i)
+            # Disagreements added by inserting item at each slot of the rest.
+            rest = np.asarray(order)
+            above = np.concatenate([[0], np.cumsum(prefs[item, rest])])          # item preferred, placed below
+            below = np.concatenate([np.cumsum(prefs[rest[::-1], item])[::-1], [0]])  # placed above, preferred
+            costs = above + below
+            j = int(np.argmin(costs))
+            if costs[j] < costs[i]:
+                improved = True
+            else:
+                j = i
+            order.insert(j, item)
+    return order
+
+
+def kemeny(prefs: np.ndarray) -> list[int]:
+    """Ordering with the fewest pairwise disagreements (exact for small inputs)."""
+    n = len(prefs)
+    if n <= 1:
+        return list(range(n))
+    if n <= KEMENY_EXACT_MAX:
+        return _kemeny_exact(prefs)
+    return _kemeny_local(prefs, borda(prefs))
@@ -27,3 +27,63 @@ PLACEHOLDER = "-- Select --"
 
 # Race configuration
 NUM_RACES = 24
+
+# Read cache (seconds each cached table stays fresh before reloading)
+CACHE_TTL_SECONDS = {
+    "drivers": 3600,
+    "constructors": 3600,
+    "races": 3600,
+    "season_predictions": 60,
+    "race_predictions": 60,
+    "fun_predictions": 30,
+    "race_results": 300,
+    "leaderboard": 300,
+    "user_similarity": 300,
+}
+CACHE_DEFAULT_TTL_SECONDS = 60
+CACHE_MAX_ENTRIES = 256
+
+# Tables the cache follows through the change feed, and their TTL while a
+# feed that sees every writer (Supabase Realtime) is connected.
+CHANGE_FEED_TABLES = ["season_predictions", "race_predictions", "race_results", "fun_predictions", "leaderboard"]
+CACHE_TTL_LIVE_SECONDS = 3600
+
+# Cached results computed from several tables, dropped when any source changes.
+DERIVED_TABLES = {
+    "race_predictions": ["user_similarity"],
+    "season_predictions": ["user_similarity"],
+}
+
+# Race scoring (per driver, predicted vs. actual finishing position)
+SCORING_EXACT_POINTS = 5      # driver predicted in exactly the right position
+SCORING_NEAR_POINTS = 3       # best case for a miss, before the distance penalty
+SCORING_DISTANCE_PENALTY = 1  # points lost per position off (floored at 0)
+SCORING_PODIUM_BONUS = 2      # driver predicted on the podium who finished on it
+
+# F1 championship points for P1..P10 in a Grand Prix
+F1_RACE_POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+# Championship simulator (Insights page)
+SIM_SAMPLES = 100_000     # seasons per run
+SIM_CHUNK_SIZE = 5_000    # seasons per vectorized chunk (bounds memory per worker)
+SIM_RACE_NOISE = 3.0      # s.d. in positions around a user's pick for that race
+SIM_SEASON_NOISE = 5.0    # s.d. around their season pick for races they haven't predicted
+
+# User similarity (Insights page): top-k overlap looks at the top
+# SIMILARITY_TOP_K picks (at most half of the ordering)
+SIMILARITY_TOP_K = 10
+
+# Supabase HTTP transport (each can be overridden by the setting of the same name)
+SUPABASE_CONNECT_TIMEOUT = 5.0     # seconds to open a connection
+SUPABASE_READ_TIMEOUT = 15.0       # seconds to wait for a response
+SUPABASE_MAX_CONNECTIONS = 20      # pooled keep-alive connections shared by all sessions
+SUPABASE_KEEPALIVE_SECONDS = 30.0  # idle time before a pooled connection is closed
+SUPABASE_READ_RETRIES = 3          # extra attempts for reads after a network error
+SUPABASE_RETRY_BACKOFF = 0.25      # base delay in seconds, doubled per attempt, with jitter
+
+# Bulk writes: rows per upsert request
+BATCH_WRITE_SIZE = 500
+
+# Fun predictions wall: cards per "load more" page (a multiple of the 3-card row)
+FUN_PAGE_SIZE = 24
+FUN_SEARCH_LIMIT = 30  # most results shown for a search
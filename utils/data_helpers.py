@@ -1,25 +1,193 @@
-"""Data loading and saving utilities — Supabase only."""
+"""Data loading and saving utilities for the configured storage backend.
+
+Reads go through a shared, per-table TTL cache; every write helper
+invalidates the cache for the table it touched. Writes from other sessions
+(or other processes, with Supabase) arrive through the change feed, which
+patches the affected cached rows in place.
+"""
 from __future__ import annotations
 
+import contextvars
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
 import streamlit as st
 import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.cache import TableCache
+from utils.constants import (
+    BATCH_WRITE_SIZE,
+    CACHE_DEFAULT_TTL_SECONDS,
+    CACHE_TTL_LIVE_SECONDS,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL_SECONDS,
+    CHANGE_FEED_TABLES,
+    CONSTRUCTOR_POSITIONS,
+    DERIVED_TABLES,
+    DRIVER_POSITIONS,
+    FUN_PAGE_SIZE,
+    FUN_SEARCH_LIMIT,
+    NUM_DRIVERS,
+    PLACEHOLDER,
+    SIM_RACE_NOISE,
+    SIM_SAMPLES,
+    SIM_SEASON_NOISE,
+)
+from utils.consensus import borda, kemeny, pairwise_preferences
+from utils.changefeed import DELETE, LOST, RESYNC, ChangeEvent, ChangeFeed
+from utils.config import get_setting
+from utils.db import get_change_feed, get_client
+from utils.encoding import encode_ordering, expand_orderings, ids_matrix, ids_to_orderings
+from utils.scoring import finishing_positions, score_predictions_by_id
+from utils.search import SearchIndex
+from utils.similarity import SimilarityMatrix, similarity_matrix
+from utils.simulation import points_by_slot, simulate_season
+from utils.telemetry import instrument
+
+RACE_POSITIONS = [f"P{i}" for i in range(1, NUM_DRIVERS + 1)]
 
-from utils.db import get_client
+logger = logging.getLogger(__name__)
+_cache = TableCache(CACHE_TTL_SECONDS, CACHE_DEFAULT_TTL_SECONDS, CACHE_MAX_ENTRIES)
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="f1-data")
+_feed: ChangeFeed | None = None
+_feed_lock = threading.Lock()
+_warm_up_started = threading.Event()
 
 
 def _require_client():
-    """Return the Supabase client or stop with an error."""
+    """Return the storage client or stop with an error."""
     sb = get_client()
     if sb is None:
-        st.error("Supabase is not configured. Set SUPABASE_URL and SUPABASE_KEY in secrets.")
+        st.error(
+            "Supabase is not configured. Set SUPABASE_URL and SUPABASE_KEY in secrets, "
+            'or set STORAGE_BACKEND = "sqlite" for local storage.'
+        )
         st.stop()
+    _follow_change_feed()
+    _start_warm_up()
     return sb
 
 
+# ---------------------------------------------------------------------------
+# Read cache
+# ---------------------------------------------------------------------------
+
+def _cached(table: str) -> Callable:
+    """Serve a loader through the shared cache, keyed on its keyword arguments.
+
+    Callers always get a copy so page-level mutations (e.g. adding helper
+    columns) never leak into the shared entry. Every call is timed by
+    :mod:`utils.telemetry`, cache hits included.
+    """
+    def decorator(fn: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        signature = inspect.signature(fn)
+
+        @instrument("data")
+        @functools.wraps(fn)
+        def wrapper(**params) -> pd.DataFrame:
+            # Bind defaults too, so the key (and _patched) sees every argument
+            # whether or not the caller spelled it out.
+            bound = signature.bind(**params)
+            bound.apply_defaults()
+            key = (fn.__name__, tuple(sorted(bound.arguments.items())))
+            df = _cache.get_or_load(table, key, lambda: fn(**params))
+            return df.copy()
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Change feed
+# ---------------------------------------------------------------------------
+
+def _follow_change_feed() -> None:
+    """Subscribe the cache to the current client's change feed (once per feed)."""
+    global _feed
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return  # a CLI script: its own writes invalidate the cache, no feed needed
+    feed = get_change_feed()
+    if feed is None or feed is _feed:
+        return
+    with _feed_lock:
+        if feed is _feed:
+            return
+        feed.subscribe(_apply_change)
+        feed.start(CHANGE_FEED_TABLES)
+        _feed = feed
+
+
+def _patched(params: tuple, df: pd.DataFrame, event: ChangeEvent) -> pd.DataFrame | None:
+    """Apply one row change to a cached frame, or *None* to drop the entry.
+
+    Loader filters are keyword arguments named after columns, so a row
+    belongs in an entry when it matches every non-None filter. Entries with
+    other arguments (e.g. a page cursor) cannot be patched and are dropped.
+    """
+    row_id = (event.record or event.old_record).get("id")
+    new = None if event.type == DELETE else event.record
+    if row_id is None or "id" not in df.columns or (new is not None and not set(df.columns) <= set(new)):
+        return None
+    if any(k not in df.columns for k, _ in params):
+        return None
+    out = df[df["id"] != row_id]
+    if new is not None and all(new.get(k) == v for k, v in params if v is not None):
+        out = pd.concat([out, pd.DataFrame([{c: new[c] for c in df.columns}])], ignore_index=True)
+    return out
+
+
+def _apply_change(event: ChangeEvent) -> None:
+    for derived in DERIVED_TABLES.get(event.table, []):
+        _cache.invalidate(derived)
+    if event.type == RESYNC:
+        _cache.invalidate(event.table)
+        if _feed is not None and _feed.complete:
+            _cache.set_ttl(event.table, CACHE_TTL_LIVE_SECONDS)
+    elif event.type == LOST:
+        # Entries loaded while live carry the long TTL; reload them on normal TTLs.
+        _cache.invalidate(event.table)
+        _cache.set_ttl(event.table, CACHE_TTL_SECONDS.get(event.table, CACHE_DEFAULT_TTL_SECONDS))
+    else:
+        _cache.patch(event.table, lambda key, value: (
+            value.apply(event) if isinstance(value, SearchIndex) else _patched(key[1], value, event)
+        ))
+
+
+def _written(table: str) -> None:
+    """Cache upkeep after a write to *table*.
+
+    A synchronous feed has already patched the cache by the time the write
+    returns; otherwise the table is dropped so this session reads its own write.
+    """
+    if _feed is None or not _feed.synchronous or table not in CHANGE_FEED_TABLES:
+        _cache.invalidate(table)
+        for derived in DERIVED_TABLES.get(table, []):
+            _cache.invalidate(derived)
+
+
+def invalidate_cache(table: str | None = None) -> None:
+    """Drop cached reads for *table* (or every table)."""
+    _cache.invalidate(table)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Return per-table cache hit/miss counters."""
+    return _cache.stats()
+
+
 # ---------------------------------------------------------------------------
 # Reference data
 # ---------------------------------------------------------------------------
 
+@_cached("drivers")
 def load_drivers() -> pd.DataFrame:
     sb = _require_client()
     resp = sb.table("drivers").select("*").execute()
@@ -31,6 +199,7 @@ def load_drivers() -> pd.DataFrame:
     })
 
 
+@_cached("constructors")
 def load_constructors() -> pd.DataFrame:
     sb = _require_client()
     resp = sb.table("constructors").select("*").execute()
@@ -41,6 +210,7 @@ def load_constructors() -> pd.DataFrame:
     })
 
 
+@_cached("races")
 def load_races() -> pd.DataFrame:
     sb = _require_client()
     resp = sb.table("races").select("*").execute()
@@ -52,80 +222,816 @@ def load_races() -> pd.DataFrame:
     })
 
 
+def driver_id_map() -> dict[str, int]:
+    """``driver_name -> drivers.id``, used for compact orderings."""
+    df = load_drivers()
+    return dict(zip(df["Driver Name"], df["id"].astype(int)))
+
+
+def constructor_id_map() -> dict[str, int]:
+    """``team_name -> constructors.id``, used for compact orderings."""
+    df = load_constructors()
+    return dict(zip(df["Team Name"], df["id"].astype(int)))
+
+
+def _with_ids(row: dict) -> dict:
+    """Return *row* plus the compact id array for each ordering it contains."""
+    out = dict(row)
+    if any(p in row for p in RACE_POSITIONS):
+        out["p_ids"] = encode_ordering([row.get(p) for p in RACE_POSITIONS], driver_id_map())
+    if any(p in row for p in DRIVER_POSITIONS):
+        out["d_ids"] = encode_ordering([row.get(p) for p in DRIVER_POSITIONS], driver_id_map())
+    if any(p in row for p in CONSTRUCTOR_POSITIONS):
+        out["c_ids"] = encode_ordering([row.get(p) for p in CONSTRUCTOR_POSITIONS], constructor_id_map())
+    return out
+
+
+def _id_to_name(id_map: dict[str, int]) -> dict[int, str]:
+    return {i: name for name, i in id_map.items()}
+
+
 # =========================================================================
 # Season predictions
 # =========================================================================
 
-def load_season_predictions() -> pd.DataFrame:
+SEASON_PREDICTION_COLUMNS = ["id", "user"] + DRIVER_POSITIONS + CONSTRUCTOR_POSITIONS + ["version"]
+SEASON_PREDICTION_ID_COLUMNS = ["id", "user", "version", "d_ids", "c_ids"]
+
+
+class VersionConflictError(Exception):
+    """Raised when a row changed in another session since it was read."""
+
+
+@_cached("season_predictions")
+def load_season_predictions(*, user: str | None = None) -> pd.DataFrame:
+    """Load season predictions, optionally only *user*'s row (filtered server-side)."""
     sb = _require_client()
-    resp = sb.table("season_predictions").select("*").execute()
+    query = sb.table("season_predictions").select(",".join(SEASON_PREDICTION_COLUMNS))
+    if user is not None:
+        query = query.eq("user", user)
+    resp = query.execute()
     if resp.data:
         return pd.DataFrame(resp.data)
-    cols = ["id", "user"] + [f"D{i}" for i in range(1, 23)] + [f"C{i}" for i in range(1, 12)]
-    return pd.DataFrame(columns=cols)
+    return pd.DataFrame(columns=SEASON_PREDICTION_COLUMNS)
 
 
-def upsert_season_prediction(row: dict) -> None:
-    """Insert or update a single season prediction row keyed on ``user``."""
+@_cached("season_predictions")
+def load_season_prediction_ids(*, user: str | None = None) -> pd.DataFrame:
+    """Season predictions as compact ``d_ids``/``c_ids`` arrays (a fraction of the payload)."""
+    sb = _require_client()
+    query = sb.table("season_predictions").select(",".join(SEASON_PREDICTION_ID_COLUMNS))
+    if user is not None:
+        query = query.eq("user", user)
+    resp = query.execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=SEASON_PREDICTION_ID_COLUMNS)
+
+
+def expand_season_predictions(df: pd.DataFrame) -> pd.DataFrame:
+    """Decode :func:`load_season_prediction_ids` output into D1..D22 / C1..C11 columns."""
+    df = expand_orderings(df, "d_ids", DRIVER_POSITIONS, _id_to_name(driver_id_map()))
+    return expand_orderings(df, "c_ids", CONSTRUCTOR_POSITIONS, _id_to_name(constructor_id_map()))
+
+
+@instrument("data")
+def save_season_picks(user: str, picks: dict[str, str], expected_version: int | None) -> int | None:
+    """Write only the D*/C* columns in *picks* for *user*.
+
+    *expected_version* is the row ``version`` the picks were based on, or
+    *None* if the user had no row yet. The write is a single conditional
+    update (or insert), so the other half of the row is never re-sent and a
+    concurrent save cannot be silently overwritten.
+
+    Returns the new version, or *None* if the write failed. Raises
+    :class:`VersionConflictError` if the row changed since it was read.
+    """
     sb = _require_client()
     try:
-        sb.table("season_predictions").upsert(row, on_conflict="user").execute()
+        if expected_version is None:
+            # New row: fill the untouched half with placeholders, as a full
+            # save would, and refuse to clobber a row created meanwhile.
+            other = CONSTRUCTOR_POSITIONS if set(picks) <= set(DRIVER_POSITIONS) else DRIVER_POSITIONS
+            row = _with_ids({"user": user, **{p: PLACEHOLDER for p in other}, **picks, "version": 1})
+            resp = (
+                sb.table("season_predictions")
+                .upsert(row, on_conflict="user", ignore_duplicates=True)
+                .execute()
+            )
+        else:
+            resp = (
+                sb.table("season_predictions")
+                .update(_with_ids({**picks, "version": expected_version + 1}))
+                .eq("user", user)
+                .eq("version", expected_version)
+                .execute()
+            )
     except Exception as e:
         st.error(f"Database write failed: {e}")
+        return None
+    finally:
+        _written("season_predictions")
+    if not resp.data:
+        raise VersionConflictError(f"{user}'s season prediction was changed in another session.")
+    return int(resp.data[0]["version"])
 
 
+@instrument("data")
 def delete_season_prediction(user: str) -> None:
     sb = _require_client()
     sb.table("season_predictions").delete().eq("user", user).execute()
+    _written("season_predictions")
 
 
 # =========================================================================
 # Race predictions
 # =========================================================================
 
-def load_race_predictions() -> pd.DataFrame:
+RACE_PREDICTION_COLUMNS = ["id", "race", "user"] + RACE_POSITIONS
+RACE_PREDICTION_ID_COLUMNS = ["id", "race", "user", "p_ids"]
+
+
+@_cached("race_predictions")
+def load_race_predictions(*, race: str | None = None, user: str | None = None) -> pd.DataFrame:
+    """Load race predictions, optionally filtered by *race* and/or *user*.
+
+    Filters are pushed down as PostgREST ``eq`` conditions so a page only
+    transfers the rows it renders.
+    """
     sb = _require_client()
-    resp = sb.table("race_predictions").select("*").execute()
+    query = sb.table("race_predictions").select(",".join(RACE_PREDICTION_COLUMNS))
+    if race is not None:
+        query = query.eq("race", race)
+    if user is not None:
+        query = query.eq("user", user)
+    resp = query.execute()
     if resp.data:
         return pd.DataFrame(resp.data)
-    cols = ["id", "race", "user"] + [f"P{i}" for i in range(1, 23)]
-    return pd.DataFrame(columns=cols)
+    return pd.DataFrame(columns=RACE_PREDICTION_COLUMNS)
 
 
-def upsert_race_prediction(row: dict) -> None:
-    """Insert or update a single race prediction keyed on ``(race, user)``."""
+@_cached("race_predictions")
+def load_race_prediction_ids(*, race: str | None = None, user: str | None = None) -> pd.DataFrame:
+    """Race predictions as compact ``p_ids`` arrays instead of 22 name columns."""
+    sb = _require_client()
+    query = sb.table("race_predictions").select(",".join(RACE_PREDICTION_ID_COLUMNS))
+    if race is not None:
+        query = query.eq("race", race)
+    if user is not None:
+        query = query.eq("user", user)
+    resp = query.execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=RACE_PREDICTION_ID_COLUMNS)
+
+
+def expand_race_predictions(df: pd.DataFrame) -> pd.DataFrame:
+    """Decode ``p_ids`` arrays (predictions or results) into P1..P22 name columns."""
+    return expand_orderings(df, "p_ids", RACE_POSITIONS, _id_to_name(driver_id_map()))
+
+
+@instrument("data")
+def upsert_race_prediction(row: dict) -> bool:
+    """Insert or update a single race prediction keyed on ``(race, user)``.
+
+    Returns whether the write succeeded (a failure is shown with ``st.error``).
+    """
     sb = _require_client()
     try:
-        sb.table("race_predictions").upsert(row, on_conflict="race,user").execute()
+        sb.table("race_predictions").upsert(_with_ids(row), on_conflict="race,user").execute()
     except Exception as e:
         st.error(f"Database write failed: {e}")
+        return False
+    finally:
+        _written("race_predictions")
+    _refresh_leaderboard(row["race"], [row["user"]])
+    return True
 
 
+@instrument("data")
 def delete_race_prediction(race: str, user: str) -> None:
     sb = _require_client()
     sb.table("race_predictions").delete().eq("race", race).eq("user", user).execute()
+    _written("race_predictions")
+    _refresh_leaderboard(race, [user])
+
+
+# =========================================================================
+# Race results
+# =========================================================================
+
+RACE_RESULT_COLUMNS = ["id", "race"] + RACE_POSITIONS
+
+
+@_cached("race_results")
+def load_race_results(*, race: str | None = None) -> pd.DataFrame:
+    """Load actual race results, optionally for a single *race*."""
+    sb = _require_client()
+    query = sb.table("race_results").select(",".join(RACE_RESULT_COLUMNS))
+    if race is not None:
+        query = query.eq("race", race)
+    resp = query.execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=RACE_RESULT_COLUMNS)
+
+
+@_cached("race_results")
+def load_race_result_ids(*, race: str | None = None) -> pd.DataFrame:
+    """Race results as compact ``p_ids`` arrays."""
+    sb = _require_client()
+    query = sb.table("race_results").select("id,race,p_ids")
+    if race is not None:
+        query = query.eq("race", race)
+    resp = query.execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=["id", "race", "p_ids"])
+
+
+@instrument("data")
+def upsert_race_result(row: dict) -> None:
+    """Insert or update the official result for one race, keyed on ``race``."""
+    sb = _require_client()
+    try:
+        sb.table("race_results").upsert(_with_ids(row), on_conflict="race").execute()
+    except Exception as e:
+        st.error(f"Database write failed: {e}")
+    _written("race_results")
+    _refresh_leaderboard(row["race"])
+
+
+@instrument("data")
+def delete_race_result(race: str) -> None:
+    sb = _require_client()
+    sb.table("race_results").delete().eq("race", race).execute()
+    _written("race_results")
+    _refresh_leaderboard(race)
+
+
+# =========================================================================
+# Leaderboard
+# =========================================================================
+# One row per (user, scored race) holding that race's points. A change to
+# one race's result or one user's prediction rewrites only that race's rows,
+# each an absolute value recomputed from what is stored, so overlapping
+# refreshes cannot compound. Running totals are summed on read.
+
+LEADERBOARD_COLUMNS = ["user", "race", "round", "points"]
+
+
+@_cached("leaderboard")
+def _load_leaderboard_points() -> pd.DataFrame:
+    sb = _require_client()
+    resp = sb.table("leaderboard").select(",".join(LEADERBOARD_COLUMNS)).order("round").execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+
+def load_leaderboard() -> pd.DataFrame:
+    """Load the materialized leaderboard (small: users × scored races) with ``cumulative`` points."""
+    lb = _load_leaderboard_points().sort_values(["user", "round"])
+    lb["points"] = lb["points"].astype(int)
+    lb["cumulative"] = lb.groupby("user")["points"].cumsum()
+    return lb.sort_values(["round", "user"]).reset_index(drop=True)
+
+
+def load_standings() -> pd.DataFrame:
+    """Latest cumulative points per user, best first."""
+    lb = load_leaderboard()
+    if lb.empty:
+        return pd.DataFrame(columns=["user", "round", "points", "cumulative"])
+    latest = lb.sort_values("round").groupby("user", as_index=False).last()
+    return latest.sort_values(["cumulative", "user"], ascending=[False, True]).reset_index(drop=True)
+
+
+def _round_number(race: str) -> int | None:
+    races = load_races()
+    match = races[races["Race Name"] == race]
+    if match.empty:
+        return None
+    digits = re.search(r"\d+", str(match.iloc[0]["Round Number"]))
+    return int(digits.group()) if digits else None
+
+
+def _refresh_leaderboard(race: str, users: list[str] | None = None) -> None:
+    """Re-score *race* for *users* (default: everyone affected) and write its rows."""
+    round_no = _round_number(race)
+    if round_no is None:
+        return
+    sb = _require_client()
+    try:
+        results = load_race_result_ids(race=race)
+        predictions = load_race_prediction_ids(race=race)
+        if users is not None:
+            predictions = predictions[predictions["user"].isin(users)]
+
+        query = sb.table("leaderboard").select("user").eq("race", race)
+        if users is not None:
+            query = query.in_("user", users)
+        stored = {r["user"] for r in query.execute().data or []}
+
+        new_points: dict[str, int] = {}
+        if not results.empty:
+            scores = score_predictions_by_id(predictions, results, load_drivers()["id"].astype(int).tolist())
+            new_points = dict(zip(scores["user"], scores["points"].astype(int)))
+
+        writes = [
+            {"user": user, "race": race, "round": round_no, "points": int(points)}
+            for user, points in new_points.items()
+        ]
+        removed = sorted(stored - set(new_points))
+        if writes:
+            sb.table("leaderboard").upsert(writes, on_conflict="user,race").execute()
+        if removed:
+            sb.table("leaderboard").delete().eq("race", race).in_("user", removed).execute()
+    except Exception as e:
+        logger.exception("leaderboard update for %s failed; run rebuild_leaderboard() to repair it", race)
+        st.error(f"Leaderboard update failed: {e}")
+    _written("leaderboard")
+
+
+@instrument("data")
+def rebuild_leaderboard() -> int:
+    """Recompute the whole leaderboard from scratch; returns the row count.
+
+    Only needed to backfill or repair; normal writes update it incrementally.
+    """
+    sb = _require_client()
+    scores = score_predictions_by_id(
+        load_race_prediction_ids(), load_race_result_ids(), load_drivers()["id"].astype(int).tolist()
+    )
+    scores["round"] = scores["race"].map(_round_number)
+    scores = scores.dropna(subset=["round"]).sort_values(["user", "round"])
+    scores["round"] = scores["round"].astype(int)
+    scores["points"] = scores["points"].astype(int)  # object dtype when nothing is scored yet
+    rows = scores[LEADERBOARD_COLUMNS].to_dict(orient="records")
+    try:
+        sb.table("leaderboard").delete().neq("race", "").execute()
+        if rows:
+            sb.table("leaderboard").insert(rows).execute()
+    except Exception as e:
+        st.error(f"Database write failed: {e}")
+    _written("leaderboard")
+    return len(rows)
+
+
+# =========================================================================
+# League consensus
+# =========================================================================
+
+CONSENSUS_COLUMNS = ["position", "borda", "kemeny"]
+
+
+def _consensus(id_lists: list, universe: list[int], names: list[str], positions: list[str]) -> pd.DataFrame:
+    if not id_lists:
+        return pd.DataFrame(columns=CONSENSUS_COLUMNS)
+    orderings = ids_to_orderings(ids_matrix(id_lists, len(positions)), universe)
+    prefs = pairwise_preferences(orderings, len(universe))
+    slots = range(min(len(positions), len(universe)))
+    by_borda, by_kemeny = borda(prefs), kemeny(prefs)
+    return pd.DataFrame({
+        "position": [positions[i] for i in slots],
+        "borda": [names[by_borda[i]] for i in slots],
+        "kemeny": [names[by_kemeny[i]] for i in slots],
+    })
+
+
+@_cached("race_predictions")
+def load_race_consensus(*, race: str) -> pd.DataFrame:
+    """League consensus finishing order for *race* from every user's pick.
+
+    One row per position with the Borda and Kemeny orderings. Cached like a
+    table read, so it is recomputed only after *race_predictions* changes.
+    """
+    drivers = load_drivers()
+    picks = load_race_prediction_ids(race=race)
+    return _consensus(
+        picks["p_ids"].tolist(), drivers["id"].astype(int).tolist(), drivers["Driver Name"].tolist(), RACE_POSITIONS
+    )
+
+
+@_cached("season_predictions")
+def load_season_consensus(*, championship: str = "drivers") -> pd.DataFrame:
+    """League consensus for the ``"drivers"`` or ``"constructors"`` championship."""
+    picks = load_season_prediction_ids()
+    if championship == "constructors":
+        teams = load_constructors()
+        return _consensus(
+            picks["c_ids"].tolist(), teams["id"].astype(int).tolist(), teams["Team Name"].tolist(), CONSTRUCTOR_POSITIONS
+        )
+    drivers = load_drivers()
+    return _consensus(
+        picks["d_ids"].tolist(), drivers["id"].astype(int).tolist(), drivers["Driver Name"].tolist(), DRIVER_POSITIONS
+    )
+
+
+# =========================================================================
+# User similarity
+# =========================================================================
+
+def _build_user_similarity() -> SimilarityMatrix:
+    drivers = load_drivers()["id"].astype(int).tolist()
+    teams = load_constructors()["id"].astype(int).tolist()
+    race = load_race_prediction_ids()
+    season = load_season_prediction_ids()
+    users = sorted(set(race["user"]) | set(season["user"]))
+    row_of = {u: i for i, u in enumerate(users)}
+
+    def ballot(df: pd.DataFrame, ids_col: str, universe: list[int], width: int) -> tuple[np.ndarray, np.ndarray]:
+        orderings = ids_to_orderings(ids_matrix(df[ids_col].tolist(), width), universe)
+        return df["user"].map(row_of).to_numpy(), finishing_positions(orderings, len(universe))
+
+    ballots = [ballot(group, "p_ids", drivers, NUM_DRIVERS) for _, group in race.groupby("race")]
+    if not season.empty:
+        ballots.append(ballot(season, "d_ids", drivers, len(DRIVER_POSITIONS)))
+        ballots.append(ballot(season, "c_ids", teams, len(CONSTRUCTOR_POSITIONS)))
+    return similarity_matrix(users, ballots)
+
+
+@instrument("data")
+def load_user_similarity() -> SimilarityMatrix:
+    """Kendall tau, footrule and top-k overlap between every pair of users.
+
+    Computed over every race and both season championships, and cached
+    until race or season predictions change (see ``DERIVED_TABLES``).
+    """
+    return _cache.get_or_load("user_similarity", ("load_user_similarity", ()), _build_user_similarity)
+
+
+# =========================================================================
+# Championship simulation
+# =========================================================================
+
+def _expected_slots(id_lists: list, driver_ids: list[int]) -> np.ndarray:
+    """0-based slot of each driver per ordering; unpicked drivers share the back."""
+    n = len(driver_ids)
+    positions = finishing_positions(ids_to_orderings(ids_matrix(id_lists, NUM_DRIVERS), driver_ids), n)
+    return np.where(positions > 0, positions - 1, n).astype(np.float32)
+
+
+@instrument("data")
+def championship_outlook(
+    user: str, *, samples: int = SIM_SAMPLES, seed: int | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Simulate the rest of the season from *user*'s picks.
+
+    Finished races count as scored. Every other race is sampled around the
+    user's prediction for it, or around their season driver order when they
+    have none (with more noise, ``SIM_SEASON_NOISE``). Returns driver and
+    team tables with title probability, expected position and expected points.
+    """
+    drivers = load_drivers()
+    teams = load_constructors()["Team Name"].tolist()
+    races = load_races()["Race Name"].tolist()
+    driver_ids = drivers["id"].astype(int).tolist()
+    n = len(driver_ids)
+
+    results = load_race_result_ids()
+    results = results[results["race"].isin(races)]
+    fixed = np.zeros(n, dtype=np.float32)
+    if not results.empty:
+        finished = _expected_slots(results["p_ids"].tolist(), driver_ids).astype(np.int64)
+        fixed = points_by_slot(max(n, NUM_DRIVERS) + 1)[finished].sum(0)
+
+    picks = load_race_prediction_ids(user=user)
+    picks = dict(zip(picks["race"], picks["p_ids"]))
+    season = load_season_prediction_ids(user=user)
+    season_slots = (
+        _expected_slots(season["d_ids"].tolist()[:1], driver_ids)[0]
+        if not season.empty else np.full(n, n / 2, dtype=np.float32)
+    )
+    remaining = [r for r in races if r not in set(results["race"])]
+    expected = np.empty((len(remaining), n), dtype=np.float32)
+    sigma = np.empty(len(remaining), dtype=np.float32)
+    for i, race in enumerate(remaining):
+        if race in picks:
+            expected[i], sigma[i] = _expected_slots([picks[race]], driver_ids)[0], SIM_RACE_NOISE
+        else:
+            expected[i], sigma[i] = season_slots, SIM_SEASON_NOISE
+
+    team_index = {name: i for i, name in enumerate(teams)}
+    driver_team = drivers["Driver Team"].map(team_index).fillna(-1).astype(int).to_numpy()
+    workers = get_setting("SIM_WORKERS")
+    outlook = simulate_season(
+        expected, sigma, fixed, driver_team, len(teams),
+        samples=samples, seed=seed, workers=int(workers) if workers else None,
+    )
+
+    driver_table = pd.DataFrame({
+        "Driver": drivers["Driver Name"].to_numpy(),
+        "Team": drivers["Driver Team"].to_numpy(),
+        "Title %": outlook.driver_title * 100,
+        "Exp. Position": outlook.driver_position,
+        "Exp. Points": outlook.driver_points,
+    })
+    team_table = pd.DataFrame({
+        "Team": teams,
+        "Title %": outlook.team_title * 100,
+        "Exp. Position": outlook.team_position,
+        "Exp. Points": outlook.team_points,
+    })
+    return (
+        driver_table.sort_values("Exp. Position").reset_index(drop=True),
+        team_table.sort_values("Exp. Position").reset_index(drop=True),
+    )
 
 
 # =========================================================================
 # Fun predictions
 # =========================================================================
 
+FUN_PREDICTION_COLUMNS = ["id", "user", "prediction", "date_created"]
+
+
+@_cached("fun_predictions")
 def load_fun_predictions() -> pd.DataFrame:
     sb = _require_client()
-    resp = sb.table("fun_predictions").select("*").execute()
+    resp = sb.table("fun_predictions").select(",".join(FUN_PREDICTION_COLUMNS)).execute()
+    if resp.data:
+        return pd.DataFrame(resp.data)
+    return pd.DataFrame(columns=FUN_PREDICTION_COLUMNS)
+
+
+@_cached("fun_predictions")
+def load_fun_prediction_page(*, before: int | None = None, limit: int = FUN_PAGE_SIZE) -> pd.DataFrame:
+    """Newest-first page of fun predictions with ``id`` below *before*.
+
+    Keyset pagination on the primary key, so each page costs the same
+    however much history there is. Up to ``limit + 1`` rows are returned:
+    the extra row only signals that an older page exists.
+    """
+    sb = _require_client()
+    query = sb.table("fun_predictions").select(",".join(FUN_PREDICTION_COLUMNS))
+    if before is not None:
+        query = query.lt("id", before)
+    resp = query.order("id", desc=True).limit(limit + 1).execute()
     if resp.data:
         return pd.DataFrame(resp.data)
-    return pd.DataFrame(columns=["id", "user", "prediction", "date_created"])
+    return pd.DataFrame(columns=FUN_PREDICTION_COLUMNS)
+
+
+def _build_fun_index() -> SearchIndex:
+    index = SearchIndex(text_field="prediction", filter_field="user")
+    for record in load_fun_predictions().to_dict(orient="records"):
+        index.add(record)
+    return index
+
 
+@instrument("data")
+def search_fun_predictions(query: str, *, user: str | None = None, limit: int = FUN_SEARCH_LIMIT) -> pd.DataFrame:
+    """Fun predictions matching every word of *query* (as prefixes), best first.
 
+    The index is cached like a table read and patched from the change feed,
+    so it is rebuilt only when the table is invalidated or expires.
+    """
+    index = _cache.get_or_load("fun_predictions", ("search_fun_predictions", ()), _build_fun_index)
+    rows = index.search(query, filter_value=user, limit=limit)
+    return pd.DataFrame(rows, columns=FUN_PREDICTION_COLUMNS)
+
+
+@instrument("data")
 def insert_fun_prediction(row: dict) -> None:
     sb = _require_client()
     try:
         sb.table("fun_predictions").insert(row).execute()
     except Exception as e:
         st.error(f"Database write failed: {e}")
+    _written("fun_predictions")
 
 
+@instrument("data")
 def delete_fun_prediction(prediction_id: int) -> None:
     sb = _require_client()
     sb.table("fun_predictions").delete().eq("id", prediction_id).execute()
+    _written("fun_predictions")
+
+
+# =========================================================================
+# Bulk writes
+# =========================================================================
+# Many rows per request, in chunks of BATCH_WRITE_SIZE. Rows are validated
+# up front; a chunk the database rejects is retried row by row so each
+# failure is reported against its own input row.
+
+@dataclass
+class BatchResult:
+    written: int = 0
+    errors: dict[int, str] = field(default_factory=dict)  # input row index -> problem
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _ordering_problems(row: dict, positions: list[str], names: set[str]) -> list[str]:
+    picks = [row[p] for p in positions if row.get(p) and row[p] != PLACEHOLDER]
+    problems = [f"unknown {n!r}" for n in picks if n not in names]
+    dupes = sorted({n for n in picks if picks.count(n) > 1})
+    if dupes:
+        problems.append(f"listed twice: {', '.join(dupes)}")
+    return problems
+
+
+def _validate_batch(
+    rows: list[dict], keys: list[str], orderings: list[tuple[list[str], set[str]]], result: BatchResult
+) -> list[tuple[int, dict]]:
+    """Return ``(index, normalized row)`` for rows without problems; record the rest."""
+    races = set(load_races()["Race Name"])
+    valid: list[tuple[int, dict]] = []
+    seen: dict[tuple, int] = {}
+    for i, row in enumerate(rows):
+        problems = [f"missing {k}" for k in keys if not row.get(k)]
+        if "race" in keys and row.get("race") and row["race"] not in races:
+            problems.append(f"unknown race {row['race']!r}")
+        for positions, names in orderings:
+            problems += _ordering_problems(row, positions, names)
+        key = tuple(row.get(k) for k in keys)
+        if key in seen:
+            problems.append(f"same {'/'.join(keys)} as row {seen[key]}")
+        seen.setdefault(key, i)
+        if problems:
+            result.errors[i] = "; ".join(problems)
+            continue
+        # PostgREST bulk upserts need every row to carry the same columns.
+        normalized = {k: row[k] for k in keys}
+        for positions, _ in orderings:
+            normalized.update({p: row.get(p) or None for p in positions})
+        valid.append((i, _with_ids(normalized)))
+    return valid
+
+
+def _upsert_chunks(table: str, rows: list[tuple[int, dict]], on_conflict: str, result: BatchResult) -> None:
+    sb = _require_client()
+    for start in range(0, len(rows), BATCH_WRITE_SIZE):
+        chunk = rows[start:start + BATCH_WRITE_SIZE]
+        try:
+            sb.table(table).upsert([r for _, r in chunk], on_conflict=on_conflict).execute()
+            result.written += len(chunk)
+            continue
+        except Exception as e:
+            if len(chunk) == 1:
+                result.errors[chunk[0][0]] = str(e)
+                continue
+        for i, row in chunk:
+            try:
+                sb.table(table).upsert(row, on_conflict=on_conflict).execute()
+                result.written += 1
+            except Exception as e:
+                result.errors[i] = str(e)
+    _written(table)
+
+
+@instrument("data")
+def upsert_race_predictions(rows: list[dict], *, dry_run: bool = False) -> BatchResult:
+    """Insert or update many race predictions (``race, user, P1..P22``)."""
+    result = BatchResult()
+    valid = _validate_batch(rows, ["race", "user"], [(RACE_POSITIONS, set(driver_id_map()))], result)
+    if dry_run or not valid:
+        return result
+    _upsert_chunks("race_predictions", valid, "race,user", result)
+    written = [row for i, row in valid if i not in result.errors]
+    for race in dict.fromkeys(r["race"] for r in written):
+        _refresh_leaderboard(race, sorted({r["user"] for r in written if r["race"] == race}))
+    return result
+
+
+@instrument("data")
+def upsert_race_results(rows: list[dict], *, dry_run: bool = False) -> BatchResult:
+    """Insert or update official results for many races (``race, P1..P22``)."""
+    result = BatchResult()
+    valid = _validate_batch(rows, ["race"], [(RACE_POSITIONS, set(driver_id_map()))], result)
+    if dry_run or not valid:
+        return result
+    _upsert_chunks("race_results", valid, "race", result)
+    for i, row in valid:
+        if i not in result.errors:
+            _refresh_leaderboard(row["race"])
+    return result
+
+
+@instrument("data")
+def upsert_season_predictions(rows: list[dict], *, dry_run: bool = False) -> BatchResult:
+    """Insert or replace many season predictions (``user, D1..D22, C1..C11``).
+
+    Each row's ``version`` is bumped past the stored one, so sessions still
+    editing an overwritten prediction get a :class:`VersionConflictError`
+    on their next save instead of silently undoing the import.
+    """
+    result = BatchResult()
+    valid = _validate_batch(
+        rows,
+        ["user"],
+        [(DRIVER_POSITIONS, set(driver_id_map())), (CONSTRUCTOR_POSITIONS, set(constructor_id_map()))],
+        result,
+    )
+    if dry_run or not valid:
+        return result
+    sb = _require_client()
+    resp = (
+        sb.table("season_predictions")
+        .select("user,version")
+        .in_("user", [row["user"] for _, row in valid])
+        .execute()
+    )
+    versions = {r["user"]: int(r["version"]) for r in resp.data or []}
+    for _, row in valid:
+        row["version"] = versions.get(row["user"], 0) + 1
+    _upsert_chunks("season_predictions", valid, "user", result)
+    return result
+
+
+# =========================================================================
+# Warm-up
+# =========================================================================
+# Streamlit runs no app code before the first session, so the first client
+# resolution kicks off a background load of what every page reads. The
+# first page renders while the rest fills in; concurrent requests for the
+# same entry wait for that load instead of repeating it.
+
+WARM_UP_TABLES = (
+    "drivers",
+    "constructors",
+    "races",
+    "leaderboard",
+    "season_prediction_ids",
+    "race_prediction_ids",
+    "fun_predictions",
+)
+
+
+def warm_up() -> dict[str, float]:
+    """Load :data:`WARM_UP_TABLES` into the cache; returns seconds per table."""
+    timings: dict[str, float] = {}
+
+    def timed(name: str) -> None:
+        t0 = time.perf_counter()
+        _LOADERS[name]()
+        timings[name] = time.perf_counter() - t0
+
+    # Own threads, so the page's load_tables never queues behind the warm-up.
+    with ThreadPoolExecutor(max_workers=len(WARM_UP_TABLES), thread_name_prefix="f1-warm-up") as pool:
+        for future in [pool.submit(timed, name) for name in WARM_UP_TABLES]:
+            future.result()
+    return timings
+
+
+def _start_warm_up() -> None:
+    if _warm_up_started.is_set() or str(get_setting("WARM_UP", "1")).lower() in {"0", "false", "no", "off"}:
+        return
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return  # a CLI script, not a page: it loads only the tables it uses
+    _warm_up_started.set()
+    threading.Thread(target=_warm_up_quietly, name="f1-warm-up", daemon=True).start()
+
+
+def _warm_up_quietly() -> None:
+    try:
+        timings = warm_up()
+        logger.info("warm-up loaded %d tables in %.0f ms", len(timings), max(timings.values()) * 1000)
+    except Exception:
+        logger.exception("warm-up failed; tables will load on first use")
+
+
+# =========================================================================
+# Batched loading
+# =========================================================================
+
+_LOADERS: dict[str, Callable[..., pd.DataFrame]] = {
+    "drivers": load_drivers,
+    "constructors": load_constructors,
+    "races": load_races,
+    "season_predictions": load_season_predictions,
+    "race_predictions": load_race_predictions,
+    "fun_predictions": load_fun_predictions,
+    "race_results": load_race_results,
+    "leaderboard": load_leaderboard,
+    "season_prediction_ids": load_season_prediction_ids,
+    "race_prediction_ids": load_race_prediction_ids,
+    "race_result_ids": load_race_result_ids,
+}
+
+
+def load_tables(*tables: str, **filtered: dict) -> dict[str, pd.DataFrame]:
+    """Fetch several tables concurrently and return them keyed by table name.
+
+    Names are table names, or ``<table>_ids`` for the compact-array loaders.
+    Positional names load whole tables; keyword arguments pass filters to
+    that table's loader, e.g. ``load_tables("drivers", race_predictions={"race": r})``.
+    Page latency becomes that of the slowest query rather than the sum of
+    every round trip. Cached tables come back without touching the network.
+    """
+    requests = {t: {} for t in tables} | filtered
+    unknown = [t for t in requests if t not in _LOADERS]
+    if unknown:
+        raise KeyError(f"No loader for table(s): {', '.join(unknown)}")
+    # Resolve the client on the script thread so a missing config still
+    # surfaces through st.error/st.stop instead of inside a worker.
+    _require_client()
+    # Each worker runs in a copy of this context so telemetry lands in the current rerun.
+    futures = {
+        t: _pool.submit(contextvars.copy_context().run, _LOADERS[t], **params)
+        for t, params in requests.items()
+    }
+    return {t: f.result() for t, f in futures.items()}
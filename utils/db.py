@@ -1,36 +1,202 @@
-"""Supabase client singleton."""
+"""Storage client singleton.
+
+The rest of the app talks to storage through the Supabase query-builder
+chain (``table().select().eq().execute()``). Two backends implement it:
+
+* ``supabase`` — the hosted PostgreSQL project (production).
+* ``sqlite``   — an embedded file seeded from ``data/*.csv`` (local/offline).
+
+Pick one with the ``STORAGE_BACKEND`` setting (secrets or environment).
+When it is unset, Supabase is used if its credentials are present and
+SQLite otherwise.
+
+The client is created once, under a lock, and shared by every session.
+Supabase requests go through one pooled ``httpx.Client`` (keep-alive
+connections, connect/read timeouts), and reads that fail with a network
+error are retried with jittered exponential backoff.
+
+The supabase/httpx stack (~0.4 s to import) is only imported when a
+Supabase client is actually built, so SQLite runs never pay for it.
+"""
 from __future__ import annotations
 
-import streamlit as st
+import importlib.util
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from utils import constants
+from utils.changefeed import ChangeFeed, RealtimeChangeFeed
+from utils.config import get_setting
+from utils.sqlite_backend import DEFAULT_DB_PATH, SQLiteClient
 
-try:
-    from supabase import create_client, Client  # type: ignore[import-untyped]
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client  # type: ignore[import-untyped]
 
-    _HAS_SUPABASE = True
-except ImportError:
-    _HAS_SUPABASE = False
-    Client = None  # type: ignore[assignment,misc]
+_HAS_SUPABASE = importlib.util.find_spec("supabase") is not None
 
 
-_client: "Client | None" = None
+_client: Any = None
 _client_checked: bool = False
+_client_lock = threading.Lock()
+_feed: ChangeFeed | None = None
 
 
-def get_client() -> "Client | None":
-    """Return a shared Supabase client, or *None* if secrets are missing."""
-    global _client, _client_checked
-    if _client_checked:
-        return _client
+def _number(name: str) -> float:
+    """Numeric transport setting, falling back to ``utils.constants``."""
+    return float(get_setting(name) or getattr(constants, name))
+
+
+# ---------------------------------------------------------------------------
+# Supabase transport
+# ---------------------------------------------------------------------------
+
+def _http_client() -> "httpx.Client":
+    """One keep-alive connection pool shared by every session thread."""
+    import httpx
+
+    max_connections = int(_number("SUPABASE_MAX_CONNECTIONS"))
+    return httpx.Client(
+        timeout=httpx.Timeout(_number("SUPABASE_READ_TIMEOUT"), connect=_number("SUPABASE_CONNECT_TIMEOUT")),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=_number("SUPABASE_KEEPALIVE_SECONDS"),
+        ),
+        follow_redirects=True,
+    )
+
+
+def _create_supabase_client() -> "Client | None":
     if not _HAS_SUPABASE:
-        _client_checked = True
         return None
-    try:
-        url: str = st.secrets["SUPABASE_URL"]
-        key: str = st.secrets["SUPABASE_KEY"]
-    except (KeyError, FileNotFoundError):
-        _client_checked = True
+    url = get_setting("SUPABASE_URL")
+    key = get_setting("SUPABASE_KEY")
+    if not url or not key:
         return None
-    _client = create_client(url, key)
-    _client_checked = True
+    from supabase import ClientOptions, create_client  # type: ignore[import-untyped]
+
+    try:
+        options = ClientOptions(httpx_client=_http_client())
+    except TypeError:
+        # supabase-py before httpx_client support: timeouts only.
+        options = ClientOptions(postgrest_client_timeout=_number("SUPABASE_READ_TIMEOUT"))
+    return RetryingClient(
+        create_client(url, key, options=options),
+        retries=int(_number("SUPABASE_READ_RETRIES")),
+        backoff=_number("SUPABASE_RETRY_BACKOFF"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Read retries
+# ---------------------------------------------------------------------------
+
+class _RetryingQuery:
+    """Forwards the query-builder chain; retries ``execute()`` for reads only."""
+
+    def __init__(self, client: "RetryingClient", query: Any) -> None:
+        self._client = client
+        self._query = query
+        self._verb: str | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._query, name)
+
+        def chain(*args: Any, **kwargs: Any) -> "_RetryingQuery":
+            if self._verb is None:
+                self._verb = name
+            self._query = method(*args, **kwargs)
+            return self
+
+        return chain
+
+    def execute(self) -> Any:
+        if self._verb != "select":
+            return self._query.execute()
+        import httpx  # already loaded by the Supabase client
+
+        attempt = 0
+        while True:
+            try:
+                return self._query.execute()
+            except httpx.TransportError:
+                if attempt >= self._client.retries:
+                    raise
+                # Full jitter keeps concurrent sessions from retrying in lockstep.
+                time.sleep(random.uniform(0, self._client.backoff * 2**attempt))
+                attempt += 1
+
+
+class RetryingClient:
+    """Supabase client wrapper adding retries to idempotent reads.
+
+    Writes are sent once: an upsert or insert that timed out may still
+    have been applied, so retrying it is the caller's decision.
+    """
+
+    def __init__(self, inner: Any, retries: int, backoff: float) -> None:
+        self.inner = inner
+        self.retries = retries
+        self.backoff = backoff
+
+    def table(self, name: str) -> _RetryingQuery:
+        return _RetryingQuery(self, self.inner.table(name))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+
+# ---------------------------------------------------------------------------
+# Shared client
+# ---------------------------------------------------------------------------
+
+def _create_client() -> Any:
+    backend = (get_setting("STORAGE_BACKEND") or "").lower()
+    if backend == "sqlite":
+        return SQLiteClient(get_setting("SQLITE_PATH") or DEFAULT_DB_PATH)
+    if backend == "supabase":
+        return _create_supabase_client()
+    return _create_supabase_client() or SQLiteClient(get_setting("SQLITE_PATH") or DEFAULT_DB_PATH)
+
+
+def get_client() -> Any:
+    """Return the shared storage client, or *None* if no backend is configured."""
+    global _client, _client_checked
+    if _client_checked:
+        return _client
+    with _client_lock:
+        if not _client_checked:
+            _client = _create_client()
+            _client_checked = True
     return _client
 
+
+def set_client(client: Any) -> None:
+    """Replace the shared client (benchmarks and scripts); *None* re-reads settings."""
+    global _client, _client_checked
+    with _client_lock:
+        _client = client
+        _client_checked = client is not None
+
+
+def get_change_feed() -> ChangeFeed | None:
+    """Row-change feed matching the shared client, or *None*.
+
+    Supabase gets a Realtime feed; SQLite its in-process feed. Set
+    ``CHANGE_FEED = "0"`` to disable (reads then rely on TTLs alone).
+    """
+    global _feed
+    client = get_client()
+    if client is None or str(get_setting("CHANGE_FEED", "1")).lower() in {"0", "false", "no", "off"}:
+        return None
+    if isinstance(client, SQLiteClient):
+        return client.feed
+    if isinstance(client, RetryingClient):
+        with _client_lock:
+            if _feed is None:
+                _feed = RealtimeChangeFeed(get_setting("SUPABASE_URL"), get_setting("SUPABASE_KEY"))
+        return _feed
+    return None
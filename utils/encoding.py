@@ -0,0 +1,53 @@
+"""Compact integer encoding of prediction orderings.
+
+An ordering (P1..P22, D1..D22 or C1..C11) is stored as a ``smallint[]`` of
+reference-table ids (``drivers.id`` / ``constructors.id``) instead of one
+TEXT column of full names per slot. Empty slots are ``0``.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import PLACEHOLDER
+
+EMPTY_ID = 0
+
+
+def encode_ordering(names: list[str], name_to_id: dict[str, int]) -> list[int]:
+    """Names in slot order -> ids (``0`` for empty/placeholder/unknown)."""
+    return [int(name_to_id.get(n, EMPTY_ID)) if n and n != PLACEHOLDER else EMPTY_ID for n in names]
+
+
+def ids_matrix(id_lists: pd.Series | list, width: int) -> np.ndarray:
+    """Stack id arrays into an ``(n, width)`` int16 matrix; missing rows are all ``0``."""
+    out = np.zeros((len(id_lists), width), dtype=np.int16)
+    for r, ids in enumerate(id_lists):
+        if ids is not None and len(ids):
+            out[r, : min(len(ids), width)] = ids[:width]
+    return out
+
+
+def ids_to_orderings(matrix: np.ndarray, universe: list[int]) -> np.ndarray:
+    """Map an id matrix to indices into *universe* (``-1`` for empty/unknown).
+
+    The result is an ``(n, slots)`` matrix of item indices ready for
+    ``utils.scoring.finishing_positions``, so scoring and comparison never
+    touch strings.
+    """
+    lut = np.full(max(max(universe, default=0), int(matrix.max(initial=0))) + 1, -1, dtype=np.int16)
+    lut[np.asarray(universe, dtype=np.int64)] = np.arange(len(universe), dtype=np.int16)
+    lut[EMPTY_ID] = -1
+    return lut[matrix]
+
+
+def expand_orderings(
+    df: pd.DataFrame, ids_col: str, positions: list[str], id_to_name: dict[int, str]
+) -> pd.DataFrame:
+    """Return *df* with *ids_col* decoded into one name column per position."""
+    matrix = ids_matrix(df[ids_col].tolist(), len(positions))
+    lut = np.full(max(max(id_to_name, default=0), int(matrix.max(initial=0))) + 1, "", dtype=object)
+    for i, name in id_to_name.items():
+        lut[i] = name
+    names = pd.DataFrame(lut[matrix], columns=positions, index=df.index)
+    return pd.concat([df.drop(columns=[ids_col]), names], axis=1)
@@ -0,0 +1,62 @@
+"""Projected championship points from a predicted driver ordering.
+
+A predicted Drivers' Championship order is read as the expected finishing
+order of every race: P1 scores the winner's points each race, P2 the
+runner-up's, and so on down the official table (``F1_RACE_POINTS``).
+Team points are the sum of their drivers'; ties are broken by countback
+(the team whose best driver is higher wins, then the next driver).
+
+Projections are memoized per (ordering, driver teams, races), so asking
+again for the same picks costs a dictionary lookup.
+"""
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+
+from utils.constants import F1_RACE_POINTS, PLACEHOLDER
+
+PROJECTION_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Projected points, best first: ``(name, points)`` pairs."""
+
+    drivers: tuple[tuple[str, int], ...]
+    teams: tuple[tuple[str, int], ...]
+
+    @property
+    def team_order(self) -> list[str]:
+        return [team for team, _ in self.teams]
+
+
+def project_standings(order: list[str], driver_teams: dict[str, str], races: int) -> Projection:
+    """Project *races* races of the driver *order* (empty/placeholder slots are skipped).
+
+    Only teams with at least one placed driver appear in the result.
+    """
+    return _project(tuple(order), tuple(sorted(driver_teams.items())), races)
+
+
+@functools.lru_cache(maxsize=PROJECTION_CACHE_SIZE)
+def _project(order: tuple[str, ...], driver_teams: tuple[tuple[str, str], ...], races: int) -> Projection:
+    teams_of = dict(driver_teams)
+    drivers: list[tuple[str, int]] = []
+    team_points: dict[str, int] = {}
+    team_finishes: dict[str, list[int]] = {}
+    for slot, driver in enumerate(order):
+        if not driver or driver == PLACEHOLDER:
+            continue
+        points = (F1_RACE_POINTS[slot] if slot < len(F1_RACE_POINTS) else 0) * races
+        drivers.append((driver, points))
+        team = teams_of.get(driver)
+        if team is None:
+            continue
+        team_points[team] = team_points.get(team, 0) + points
+        team_finishes.setdefault(team, []).append(slot)  # slots arrive in order: best first
+
+    # Countback: a missing second driver counts as finishing behind everyone.
+    behind = [len(order)] * 2
+    teams = sorted(team_points, key=lambda t: (-team_points[t], team_finishes[t] + behind, t))
+    return Projection(tuple(drivers), tuple((t, team_points[t]) for t in teams))
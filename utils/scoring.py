@@ -0,0 +1,109 @@
+"""Vectorized scoring of race predictions against actual results.
+
+Orderings are read as compact ``p_ids`` arrays and converted to integer
+matrices once, then every (user, race) prediction is scored in a single
+NumPy pass:
+
+* ``utils.encoding.ids_to_orderings``  ``p_ids``            -> driver index per slot
+* ``finishing_positions``              driver index per slot -> 1-based position per driver
+* ``score_predictions_by_id``          predictions × results -> points per (race, user)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import (
+    SCORING_DISTANCE_PENALTY,
+    SCORING_EXACT_POINTS,
+    SCORING_NEAR_POINTS,
+    SCORING_PODIUM_BONUS,
+)
+from utils.encoding import ids_matrix, ids_to_orderings
+
+SCORE_COLUMNS = ["race", "user", "exact", "distance", "podium", "points"]
+
+
+def finishing_positions(orderings: np.ndarray, n_items: int) -> np.ndarray:
+    """Invert orderings: ``out[r, item]`` is the 1-based slot of *item*, 0 if absent."""
+    rows, slots = orderings.shape
+    # Route missing slots (-1) to a spare column that is dropped afterwards.
+    out = np.zeros((rows, n_items + 1), dtype=np.int16)
+    cols = np.where(orderings >= 0, orderings, n_items)
+    out[np.arange(rows)[:, None], cols] = np.arange(1, slots + 1, dtype=np.int16)
+    return out[:, :n_items]
+
+
+def score_matrix(
+    predicted: np.ndarray,
+    actual: np.ndarray,
+    *,
+    exact_points: int = SCORING_EXACT_POINTS,
+    near_points: int = SCORING_NEAR_POINTS,
+    distance_penalty: int = SCORING_DISTANCE_PENALTY,
+    podium_bonus: int = SCORING_PODIUM_BONUS,
+) -> dict[str, np.ndarray]:
+    """Score aligned position matrices (rows × drivers) from :func:`finishing_positions`.
+
+    Per driver: *exact_points* for the exact position, otherwise
+    ``max(0, near_points - distance_penalty * |Δ|)``; plus *podium_bonus*
+    when predicted on the podium and finished on it.
+    """
+    valid = (predicted > 0) & (actual > 0)
+    dist = np.abs(predicted.astype(np.int32) - actual.astype(np.int32))
+    exact = valid & (dist == 0)
+    near = np.where(valid & ~exact, np.maximum(0, near_points - distance_penalty * dist), 0)
+    podium = valid & (predicted <= 3) & (actual <= 3)
+    points = exact.sum(1) * exact_points + near.sum(1) + podium.sum(1) * podium_bonus
+    return {
+        "exact": exact.sum(1),
+        "distance": np.where(valid, dist, 0).sum(1),
+        "podium": podium.sum(1),
+        "points": points,
+    }
+
+
+def _score_frame(
+    scored: pd.DataFrame,
+    predicted: np.ndarray,
+    actual_by_race: np.ndarray,
+    result_row: dict[str, int],
+    rules: dict[str, int],
+) -> pd.DataFrame:
+    actual = actual_by_race[scored["race"].map(result_row).to_numpy()]
+    out = pd.DataFrame({"race": scored["race"].to_numpy(), "user": scored["user"].to_numpy()})
+    for col, values in score_matrix(predicted, actual, **rules).items():
+        out[col] = values.astype(int)
+    return out
+
+
+def _scorable(predictions_df: pd.DataFrame, results_df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, int]]:
+    if predictions_df.empty or results_df.empty:
+        return predictions_df.iloc[0:0], {}
+    result_row = {race: i for i, race in enumerate(results_df["race"])}
+    return predictions_df[predictions_df["race"].isin(result_row.keys())], result_row
+
+
+def score_predictions_by_id(
+    predictions_df: pd.DataFrame,
+    results_df: pd.DataFrame,
+    driver_ids: list[int],
+    ids_col: str = "p_ids",
+    **rules: int,
+) -> pd.DataFrame:
+    """Score every prediction whose race has a result, from compact ``p_ids`` arrays.
+
+    *driver_ids* is the universe of driver ids (e.g. ``drivers.id``).
+    Returns one row per (race, user) with exact hits, total position
+    distance, podium hits and points. *rules* override the scoring
+    constants (see :func:`score_matrix`).
+    """
+    scored, result_row = _scorable(predictions_df, results_df)
+    if scored.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+    n = len(driver_ids)
+    predicted = finishing_positions(ids_to_orderings(ids_matrix(scored[ids_col].tolist(), n), driver_ids), n)
+    actual_by_race = finishing_positions(
+        ids_to_orderings(ids_matrix(results_df[ids_col].tolist(), n), driver_ids), n
+    )
+    return _score_frame(scored, predicted, actual_by_race, result_row, rules)
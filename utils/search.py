@@ -0,0 +1,156 @@
+"""In-process inverted index for ranked full-text search over short posts.
+
+Built once from the table and then kept current row by row from the change
+feed (see :meth:`SearchIndex.apply`), so a query touches only the postings
+of its own terms. Every query term matches as a prefix ("bear" finds
+"Bearman"), all terms must match, and results are ranked by BM25 with an
+exact term scoring above a longer word it is a prefix of.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from typing import Any
+
+from utils.changefeed import DELETE, ChangeEvent
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# BM25 parameters (the usual defaults).
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.8       # score factor for a word matched by prefix only
+MIN_PREFIX_LENGTH = 2     # shorter query terms must match a word exactly
+MAX_PREFIX_EXPANSIONS = 200
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case words with accents stripped ("Räikkönen" -> "raikkonen")."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return TOKEN_RE.findall(text)
+
+
+class SearchIndex:
+    """Inverted index over *text_field* of records keyed by ``id``.
+
+    Records can be filtered on *filter_field* (e.g. the posting user).
+    Safe to query while another thread adds or removes records.
+    """
+
+    def __init__(self, text_field: str, filter_field: str) -> None:
+        self._text_field = text_field
+        self._filter_field = filter_field
+        self._records: dict[Any, dict] = {}
+        self._lengths: dict[Any, int] = {}
+        self._postings: dict[str, dict[Any, int]] = {}  # term -> {id: term frequency}
+        self._vocabulary: list[str] = []                 # sorted terms, for prefix lookups
+        self._by_filter: dict[Any, set] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def add(self, record: dict) -> None:
+        """Index *record*, replacing any record with the same ``id``."""
+        doc_id = record["id"]
+        terms = tokenize(record.get(self._text_field) or "")
+        with self._lock:
+            self.remove(doc_id)
+            self._records[doc_id] = dict(record)
+            self._lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+            self._by_filter.setdefault(record.get(self._filter_field), set()).add(doc_id)
+
+    def remove(self, doc_id: Any) -> None:
+        with self._lock:
+            record = self._records.pop(doc_id, None)
+            if record is None:
+                return
+            self._total_length -= self._lengths.pop(doc_id)
+            for term in set(tokenize(record.get(self._text_field) or "")):
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+            self._by_filter[record.get(self._filter_field)].discard(doc_id)
+
+    def apply(self, event: ChangeEvent) -> SearchIndex | None:
+        """Apply one row change; *None* when the event cannot be applied."""
+        if event.type == DELETE:
+            doc_id = event.old_record.get("id")
+            if doc_id is None:
+                return None
+            self.remove(doc_id)
+            return self
+        if "id" not in event.record or self._text_field not in event.record:
+            return None
+        self.add(event.record)
+        return self
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _expansions(self, term: str) -> list[str]:
+        if len(term) < MIN_PREFIX_LENGTH:
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, term)
+        out = []
+        for word in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not word.startswith(term):
+                break
+            out.append(word)
+        return out
+
+    def search(self, query: str, *, filter_value: Any = None, limit: int = 20) -> list[dict]:
+        """Best-matching records for *query*, newest first among equal scores."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n = len(self._records)
+            if n == 0:
+                return []
+            avg_length = self._total_length / n
+            allowed = self._by_filter.get(filter_value, set()) if filter_value is not None else None
+
+            per_term: list[dict[Any, float]] = []
+            for term in terms:
+                scores: dict[Any, float] = {}
+                for word in self._expansions(term):
+                    postings = self._postings[word]
+                    idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                    weight = idf * (1.0 if word == term else PREFIX_WEIGHT)
+                    for doc_id, tf in postings.items():
+                        if allowed is not None and doc_id not in allowed:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / avg_length)
+                        score = weight * tf * (BM25_K1 + 1) / (tf + norm)
+                        if score > scores.get(doc_id, 0.0):
+                            scores[doc_id] = score
+                if not scores:
+                    return []
+                per_term.append(scores)
+
+            # Every term must match: intersect, smallest candidate set first.
+            per_term.sort(key=len)
+            matched = set(per_term[0]).intersection(*per_term[1:])
+            ranked = heapq.nlargest(limit, matched, key=lambda d: (sum(s[d] for s in per_term), d))
+            return [dict(self._records[d]) for d in ranked]
@@ -0,0 +1,112 @@
+"""Pairwise similarity between users' orderings, for every pair at once.
+
+Each ballot (one race, or one season championship) is a matrix of
+finishing positions, users × items, as from
+``utils.scoring.finishing_positions``. All three measures reduce to dot
+products of per-user feature vectors, so one matrix product per ballot
+scores every pair of users:
+
+* Kendall tau       sign(pos[a] - pos[b]) for every item pair a < b;
+                    tau = (concordant - discordant) / pairs = S_u · S_v / pairs
+* Spearman footrule [pos[item] <= t] for every item and threshold t, since
+                    |x - y| = Σ_t [x <= t] xor [y <= t] = |I_u| + |I_v| - 2 I_u · I_v
+* top-k overlap     [pos[item] <= k]; shared top-k picks = T_u · T_v
+
+Sums are accumulated over ballots and normalized by what each pair
+actually shared, so a user who skipped a race is compared on the rest.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import SIMILARITY_TOP_K
+
+METRICS = {
+    "kendall": "Kendall tau",
+    "footrule": "Footrule similarity",
+    "overlap": "Top-k overlap",
+}
+
+
+@dataclass(frozen=True)
+class SimilarityMatrix:
+    """Every measure as a ``(users, users)`` array aligned with :attr:`users`.
+
+    ``kendall`` is in [-1, 1]; ``footrule`` (1 - normalized footrule distance)
+    and ``overlap`` are in [0, 1]. Pairs with no ballot in common are NaN.
+    """
+
+    users: list[str]
+    kendall: np.ndarray
+    footrule: np.ndarray
+    overlap: np.ndarray
+    shared: np.ndarray  # ballots both users filled in
+
+    def frame(self, metric: str) -> pd.DataFrame:
+        return pd.DataFrame(getattr(self, metric), index=self.users, columns=self.users)
+
+    def most_similar(self, user: str, metric: str, n: int = 10) -> pd.DataFrame:
+        """The *n* users closest to *user* on *metric*, best first."""
+        i = self.users.index(user)
+        values = getattr(self, metric)[i]
+        out = pd.DataFrame({
+            "user": self.users,
+            METRICS[metric]: values,
+            "Shared ballots": self.shared[i],
+        }).drop(index=i)
+        return out.dropna().sort_values(METRICS[metric], ascending=False).head(n).reset_index(drop=True)
+
+
+def similarity_matrix(users: list[str], ballots: Iterable[tuple[np.ndarray, np.ndarray]]) -> SimilarityMatrix:
+    """Score every pair of *users* over *ballots*.
+
+    Each ballot is ``(rows, positions)``: indices into *users* and their
+    ``(len(rows), items)`` 1-based positions, ``0`` for an item left out
+    (ranked below every pick).
+    """
+    n_users = len(users)
+    totals = {name: np.zeros((n_users, n_users), dtype=np.float32) for name in ("tau", "foot", "top")}
+    norms = {name: np.zeros((n_users, n_users), dtype=np.float32) for name in ("tau", "foot", "top")}
+    shared = np.zeros((n_users, n_users), dtype=np.float32)
+
+    def features(rows: np.ndarray, block: np.ndarray) -> np.ndarray:
+        # Absent users get zero rows, so every update below is one dense product.
+        out = np.zeros((n_users, block.shape[1]), dtype=np.float32)
+        out[rows] = block
+        return out
+
+    for rows, positions in ballots:
+        if len(rows) == 0:
+            continue
+        n_items = positions.shape[1]
+        pos = np.where(positions > 0, positions, n_items + 1).astype(np.int16)
+        top_k = min(SIMILARITY_TOP_K, n_items // 2)
+        present = features(rows, np.ones((len(rows), 1)))
+        both = present @ present.T
+        shared += both
+
+        first, second = np.triu_indices(n_items, 1)
+        signs = features(rows, np.sign(pos[:, first] - pos[:, second]))
+        totals["tau"] += signs @ signs.T
+        norms["tau"] += both * len(first)
+
+        below = features(rows, (pos[:, :, None] <= np.arange(1, n_items + 1)).reshape(len(rows), -1))
+        counts = below.sum(1, keepdims=True)
+        # Footrule = |I_u| + |I_v| - 2 I_u·I_v, only where both users filled in the ballot.
+        totals["foot"] += both * (counts + counts.T) - 2 * (below @ below.T)
+        norms["foot"] += both * (n_items * n_items // 2)  # largest possible footrule
+
+        top = features(rows, pos <= top_k)
+        totals["top"] += top @ top.T
+        norms["top"] += both * top_k
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        missing = shared == 0
+        kendall = np.where(missing, np.nan, totals["tau"] / norms["tau"])
+        footrule = np.where(missing, np.nan, 1 - totals["foot"] / norms["foot"])
+        overlap = np.where(missing, np.nan, totals["top"] / norms["top"])
+    return SimilarityMatrix(list(users), kendall, np.clip(footrule, 0, 1), overlap, shared.astype(np.int32))
@@ -0,0 +1,143 @@
+"""Monte Carlo championship simulation from prediction orderings.
+
+Each remaining race is sampled around an expected finishing order: a
+driver's expected slot plus Gaussian noise (``sigma`` positions), sorted.
+Samples are scored with the F1 points table and added to the points from
+races that already have results, giving one full season per sample.
+
+Work is vectorized over ``(samples, races, drivers)`` arrays in chunks of
+``SIM_CHUNK_SIZE`` samples, and chunks run in a process pool. The module
+only depends on NumPy so worker processes start quickly.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.constants import F1_RACE_POINTS, SIM_CHUNK_SIZE
+
+_executor: ProcessPoolExecutor | None = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SeasonOutlook:
+    """Per-driver and per-team aggregates over all simulated seasons."""
+
+    samples: int
+    driver_title: np.ndarray     # probability of winning the drivers' title
+    driver_position: np.ndarray  # expected final championship position (1-based)
+    driver_points: np.ndarray    # expected final points
+    team_title: np.ndarray
+    team_position: np.ndarray
+    team_points: np.ndarray
+
+
+def points_by_slot(n_slots: int) -> np.ndarray:
+    """Points for finishing in each 0-based slot (zero outside the points)."""
+    out = np.zeros(n_slots, dtype=np.float32)
+    scored = F1_RACE_POINTS[:n_slots]
+    out[: len(scored)] = scored
+    return out
+
+
+def _championship(points: np.ndarray, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Title counts and summed 1-based positions for a ``(samples, entrants)`` points array."""
+    # Points are whole numbers, so a sub-point jitter breaks ties at random.
+    order = np.argsort(-(points + rng.random(points.shape, dtype=np.float32) * 0.5), axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, points.shape[1] + 1), axis=1)
+    return (positions == 1).sum(0), positions.sum(0)
+
+
+def _simulate_chunk(
+    expected: np.ndarray,
+    sigma: np.ndarray,
+    fixed_points: np.ndarray,
+    driver_team: np.ndarray,
+    n_teams: int,
+    samples: int,
+    seed: np.random.SeedSequence,
+) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    n_races, n_drivers = expected.shape
+    slot_points = points_by_slot(n_drivers)
+
+    noise = rng.standard_normal((samples, n_races, n_drivers), dtype=np.float32)
+    finish = np.argsort(expected + sigma[:, None] * noise, axis=2)  # driver index per slot
+    race_points = np.zeros(finish.shape, dtype=np.float32)
+    np.put_along_axis(race_points, finish, np.broadcast_to(slot_points, finish.shape), axis=2)
+    driver_points = race_points.sum(1) + fixed_points
+
+    membership = np.zeros((n_drivers, n_teams), dtype=np.float32)
+    known = driver_team >= 0
+    membership[np.flatnonzero(known), driver_team[known]] = 1
+    team_points = driver_points @ membership
+
+    driver_title, driver_position = _championship(driver_points, rng)
+    team_title, team_position = _championship(team_points, rng)
+    return (
+        driver_title, driver_position, driver_points.sum(0),
+        team_title, team_position, team_points.sum(0),
+    )
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool, created on first use (spawned: the app is threaded)."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def simulate_season(
+    expected: np.ndarray,
+    sigma: np.ndarray,
+    fixed_points: np.ndarray,
+    driver_team: np.ndarray,
+    n_teams: int,
+    *,
+    samples: int,
+    seed: int | None = None,
+    workers: int | None = None,
+) -> SeasonOutlook:
+    """Simulate *samples* seasons.
+
+    Parameters
+    ----------
+    expected : ``(races, drivers)`` expected 0-based slot of each driver in each remaining race
+    sigma : ``(races,)`` noise around those slots, in positions
+    fixed_points : ``(drivers,)`` points already scored in finished races
+    driver_team : ``(drivers,)`` team index of each driver (``-1`` if unknown)
+    workers : processes to use (default: every core); ``1`` runs in-process
+    """
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    expected = np.asarray(expected, dtype=np.float32)
+    sigma = np.asarray(sigma, dtype=np.float32)
+    fixed_points = np.asarray(fixed_points, dtype=np.float32)
+    driver_team = np.asarray(driver_team, dtype=np.int64)
+
+    sizes = [min(SIM_CHUNK_SIZE, samples - start) for start in range(0, samples, SIM_CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(expected, sigma, fixed_points, driver_team, n_teams, n, s) for n, s in zip(sizes, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(sizes) == 1:
+        parts = [_simulate_chunk(*a) for a in args]
+    else:
+        pool = _pool(workers)
+        parts = [f.result() for f in [pool.submit(_simulate_chunk, *a) for a in args]]
+
+    totals = [np.sum(column, axis=0, dtype=np.float64) for column in zip(*parts)]
+    return SeasonOutlook(samples, *(t / samples for t in totals))
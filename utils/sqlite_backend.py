@@ -0,0 +1,430 @@
+"""Embedded SQLite storage backend.
+
+Implements the subset of the Supabase/PostgREST query-builder chain used by
+``utils.data_helpers`` (``table().select().eq().order().limit().execute()``
+plus ``insert``/``upsert``/``update``/``delete``) on top of a local SQLite
+file in WAL mode, so the app runs offline with sub-millisecond reads.
+
+A fresh database is created from the same tables as ``supabase_schema.sql``
+and seeded from ``data/*.csv``.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from typing import Any
+
+from utils.changefeed import DELETE, INSERT, RESYNC, UPDATE, ChangeEvent, ChangeFeed
+from utils.constants import CONSTRUCTOR_POSITIONS, DRIVER_POSITIONS, NUM_DRIVERS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "f1_predictions.db")
+
+_RACE_POSITIONS = [f"P{i}" for i in range(1, NUM_DRIVERS + 1)]
+
+
+def _text_cols(cols: list[str]) -> str:
+    return ", ".join(f'"{c}" TEXT' for c in cols)
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS drivers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    driver_name TEXT NOT NULL UNIQUE,
+    driver_number INTEGER NOT NULL,
+    driver_team TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS constructors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_name TEXT NOT NULL UNIQUE,
+    team_color TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS races (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    round_number TEXT NOT NULL UNIQUE,
+    race_name TEXT NOT NULL,
+    race_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS season_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "user" TEXT NOT NULL UNIQUE,
+    {_text_cols(DRIVER_POSITIONS + CONSTRUCTOR_POSITIONS)},
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS race_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    race TEXT NOT NULL,
+    "user" TEXT NOT NULL,
+    {_text_cols(_RACE_POSITIONS)},
+    UNIQUE (race, "user")
+);
+CREATE TABLE IF NOT EXISTS race_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    race TEXT NOT NULL UNIQUE,
+    {_text_cols(_RACE_POSITIONS)}
+);
+CREATE TABLE IF NOT EXISTS leaderboard (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "user" TEXT NOT NULL,
+    race TEXT NOT NULL,
+    "round" INTEGER NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0,
+    UNIQUE ("user", race)
+);
+CREATE INDEX IF NOT EXISTS leaderboard_round_idx ON leaderboard ("round", "user");
+CREATE TABLE IF NOT EXISTS fun_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "user" TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    date_created TEXT NOT NULL
+);
+"""
+
+# Columns added after the first release; applied to existing database files.
+ADDED_COLUMNS: list[tuple[str, str, str]] = [
+    ("season_predictions", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("season_predictions", "d_ids", "TEXT"),
+    ("season_predictions", "c_ids", "TEXT"),
+    ("race_predictions", "p_ids", "TEXT"),
+    ("race_results", "p_ids", "TEXT"),
+]
+
+# smallint[] columns in Postgres; stored here as JSON text and decoded on read.
+ARRAY_COLUMNS = {"p_ids", "d_ids", "c_ids"}
+
+# CSV file -> (table, {csv header: column}) used to seed a new database.
+SEED_FILES: dict[str, tuple[str, dict[str, str]]] = {
+    "drivers.csv": ("drivers", {
+        "Driver Name": "driver_name",
+        "Driver Number": "driver_number",
+        "Driver Team": "driver_team",
+    }),
+    "constructors.csv": ("constructors", {
+        "Team Name": "team_name",
+        "Team Color": "team_color",
+    }),
+    "races.csv": ("races", {
+        "Round Number": "round_number",
+        "Race Name": "race_name",
+        "Race Date": "race_date",
+    }),
+    "season_predictions.csv": ("season_predictions", {}),
+    "race_predictions.csv": ("race_predictions", {}),
+    "fun_predictions.csv": ("fun_predictions", {}),
+    "race_results.csv": ("race_results", {}),
+}
+
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _to_sql_value(value: Any) -> Any:
+    """Unwrap NumPy scalars (e.g. ids pulled from a DataFrame) and encode arrays for sqlite3."""
+    if isinstance(value, (list, tuple)):
+        return json.dumps([_to_sql_value(v) for v in value])
+    if hasattr(value, "item") and not isinstance(value, (bytes, str)):
+        return value.item()
+    return value
+
+
+# Writes returning more rows than this publish one RESYNC, not one event per row.
+CHANGE_FEED_MAX_ROWS = 50
+
+_CHANGE_TYPES = {"insert": INSERT, "upsert": UPDATE, "update": UPDATE, "delete": DELETE}
+
+
+def _change_event(table: str, op: str, row: dict) -> ChangeEvent:
+    if op == "delete":
+        return ChangeEvent(table, DELETE, old_record=row)
+    return ChangeEvent(table, _CHANGE_TYPES[op], record=row, old_record={"id": row.get("id")})
+
+
+def _row(r: sqlite3.Row) -> dict:
+    row = dict(r)
+    for col in ARRAY_COLUMNS.intersection(row):
+        if isinstance(row[col], str):
+            row[col] = json.loads(row[col])
+    return row
+
+
+class APIResponse:
+    """Minimal stand-in for ``postgrest.APIResponse``."""
+
+    def __init__(self, data: list[dict], count: int | None = None) -> None:
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    """One PostgREST-style request against a single table."""
+
+    def __init__(self, client: "SQLiteClient", table: str) -> None:
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._count: str | None = None
+        self._payload: list[dict] = []
+        self._on_conflict = ""
+        self._ignore_duplicates = False
+        self._filters: list[tuple[str, str, Any]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: int | None = None
+
+    # --- operations ------------------------------------------------------
+
+    def select(self, columns: str = "*", count: str | None = None) -> "SQLiteQuery":
+        self._op, self._columns, self._count = "select", columns, count
+        return self
+
+    def insert(self, rows: dict | list[dict]) -> "SQLiteQuery":
+        self._op, self._payload = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(
+        self, rows: dict | list[dict], on_conflict: str = "", ignore_duplicates: bool = False
+    ) -> "SQLiteQuery":
+        self._op, self._payload = "upsert", rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict or "id"
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: dict) -> "SQLiteQuery":
+        self._op, self._payload = "update", [values]
+        return self
+
+    def delete(self) -> "SQLiteQuery":
+        self._op = "delete"
+        return self
+
+    # --- filters and modifiers -------------------------------------------
+
+    def _filter(self, col: str, op: str, value: Any) -> "SQLiteQuery":
+        self._filters.append((col, op, value))
+        return self
+
+    def eq(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, "=", value)
+
+    def neq(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, "!=", value)
+
+    def lt(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, "<", value)
+
+    def lte(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, "<=", value)
+
+    def gt(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, ">", value)
+
+    def gte(self, col: str, value: Any) -> "SQLiteQuery":
+        return self._filter(col, ">=", value)
+
+    def in_(self, col: str, values: list) -> "SQLiteQuery":
+        return self._filter(col, "IN", list(values))
+
+    def order(self, col: str, desc: bool = False) -> "SQLiteQuery":
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, size: int) -> "SQLiteQuery":
+        self._limit = size
+        return self
+
+    # --- execution -------------------------------------------------------
+
+    def _where(self) -> tuple[str, list]:
+        clauses: list[str] = []
+        params: list = []
+        for col, op, value in self._filters:
+            if op == "IN":
+                marks = ", ".join("?" for _ in value) or "NULL"
+                clauses.append(f"{_quote(col)} IN ({marks})")
+                params.extend(_to_sql_value(v) for v in value)
+            else:
+                clauses.append(f"{_quote(col)} {op} ?")
+                params.append(_to_sql_value(value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def execute(self) -> APIResponse:
+        conn = self._client.connection()
+        with conn:
+            resp = getattr(self, f"_execute_{self._op}")(conn)
+        if self._op in _CHANGE_TYPES:
+            # Published after commit, from the rows RETURNING handed back;
+            # bulk writes are announced as a single reload instead.
+            if len(resp.data) > CHANGE_FEED_MAX_ROWS:
+                self._client.feed.publish(ChangeEvent(self._table, RESYNC))
+            else:
+                for row in resp.data:
+                    self._client.feed.publish(_change_event(self._table, self._op, row))
+        return resp
+
+    def _execute_select(self, conn: sqlite3.Connection) -> APIResponse:
+        if self._columns.strip() == "*":
+            cols = "*"
+        else:
+            cols = ", ".join(_quote(c.strip()) for c in self._columns.split(",") if c.strip())
+        where, params = self._where()
+        sql = f"SELECT {cols} FROM {_quote(self._table)}{where}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(
+                f"{_quote(c)} {'DESC' if d else 'ASC'}" for c, d in self._order
+            )
+        if self._limit is not None:
+            sql += f" LIMIT {int(self._limit)}"
+        data = [_row(r) for r in conn.execute(sql, params)]
+        count = None
+        if self._count:
+            count = conn.execute(f"SELECT COUNT(*) FROM {_quote(self._table)}{where}", params).fetchone()[0]
+        return APIResponse(data, count)
+
+    def _execute_insert(self, conn: sqlite3.Connection) -> APIResponse:
+        return APIResponse(self._write_rows(conn, conflict=None))
+
+    def _execute_upsert(self, conn: sqlite3.Connection) -> APIResponse:
+        return APIResponse(self._write_rows(conn, conflict=self._on_conflict))
+
+    def _write_rows(self, conn: sqlite3.Connection, conflict: str | None) -> list[dict]:
+        out: list[dict] = []
+        for row in self._payload:
+            cols = list(row)
+            sql = (
+                f"INSERT INTO {_quote(self._table)} ({', '.join(_quote(c) for c in cols)}) "
+                f"VALUES ({', '.join('?' for _ in cols)})"
+            )
+            if conflict is not None:
+                keys = [k.strip() for k in conflict.split(",")]
+                updates = [] if self._ignore_duplicates else [c for c in cols if c not in keys]
+                sql += f" ON CONFLICT ({', '.join(_quote(k) for k in keys)}) "
+                if updates:
+                    sql += "DO UPDATE SET " + ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in updates)
+                else:
+                    sql += "DO NOTHING"
+            sql += " RETURNING *"
+            out.extend(_row(r) for r in conn.execute(sql, [_to_sql_value(row[c]) for c in cols]))
+        return out
+
+    def _execute_update(self, conn: sqlite3.Connection) -> APIResponse:
+        values = self._payload[0]
+        where, params = self._where()
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+        sql = f"UPDATE {_quote(self._table)} SET {assignments}{where} RETURNING *"
+        rows = conn.execute(sql, [_to_sql_value(v) for v in values.values()] + params)
+        return APIResponse([_row(r) for r in rows])
+
+    def _execute_delete(self, conn: sqlite3.Connection) -> APIResponse:
+        where, params = self._where()
+        rows = conn.execute(f"DELETE FROM {_quote(self._table)}{where} RETURNING *", params)
+        return APIResponse([_row(r) for r in rows])
+
+
+class SQLiteClient:
+    """Drop-in replacement for the Supabase client backed by a local file.
+
+    Each thread gets its own connection; WAL mode lets readers proceed while
+    a writer commits. Committed writes are published on :attr:`feed`.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, data_dir: str = DATA_DIR) -> None:
+        self.path = path
+        self.feed = ChangeFeed()
+        self._local = threading.local()
+        is_new = not os.path.exists(path)
+        conn = self.connection()
+        with conn:
+            conn.executescript(SCHEMA)
+            _add_missing_columns(conn)
+        if is_new:
+            seed_from_csv(conn, data_dir)
+        backfill_ordering_ids(conn)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, column, decl in ADDED_COLUMNS:
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {decl}")
+
+
+def seed_from_csv(conn: sqlite3.Connection, data_dir: str = DATA_DIR) -> None:
+    """Load every ``data/*.csv`` file listed in :data:`SEED_FILES` into *conn*."""
+    with conn:
+        for filename, (table, header_map) in SEED_FILES.items():
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, newline="") as f:
+                rows = [
+                    {header_map.get(k, k): (v if v != "" else None) for k, v in r.items()}
+                    for r in csv.DictReader(f)
+                ]
+            if not rows:
+                continue
+            cols = list(rows[0])
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {_quote(table)} ({', '.join(_quote(c) for c in cols)}) "
+                f"VALUES ({', '.join('?' for _ in cols)})",
+                [[r[c] for c in cols] for r in rows],
+            )
+
+
+# Reference table -> name column that orderings store.
+REFERENCE_NAMES = {"drivers": "driver_name", "constructors": "team_name"}
+
+# (table, key columns, [(id column, name columns, reference table)])
+ORDERING_COLUMNS = [
+    ("race_predictions", ["race", "user"], [("p_ids", _RACE_POSITIONS, "drivers")]),
+    ("race_results", ["race"], [("p_ids", _RACE_POSITIONS, "drivers")]),
+    ("season_predictions", ["user"], [
+        ("d_ids", DRIVER_POSITIONS, "drivers"),
+        ("c_ids", CONSTRUCTOR_POSITIONS, "constructors"),
+    ]),
+]
+
+
+def backfill_ordering_ids(conn: sqlite3.Connection) -> int:
+    """Fill NULL ``p_ids``/``d_ids``/``c_ids`` from the name columns.
+
+    Covers CSV-seeded rows and files created before the compact columns
+    existed; mirrors the backfill in ``supabase_schema.sql``. Returns rows
+    updated.
+    """
+    ids = {
+        ref: {name: i for i, name in conn.execute(f"SELECT id, {_quote(col)} FROM {_quote(ref)}")}
+        for ref, col in REFERENCE_NAMES.items()
+    }
+    updated = 0
+    with conn:
+        for table, keys, orderings in ORDERING_COLUMNS:
+            missing = " OR ".join(f"{_quote(col)} IS NULL" for col, _, _ in orderings)
+            for row in conn.execute(f"SELECT * FROM {_quote(table)} WHERE {missing}").fetchall():
+                values = {
+                    col: json.dumps([ids[ref].get(row[p], 0) for p in positions])
+                    for col, positions, ref in orderings
+                }
+                conn.execute(
+                    f"UPDATE {_quote(table)} SET {', '.join(f'{_quote(c)} = ?' for c in values)} "
+                    f"WHERE {' AND '.join(f'{_quote(k)} = ?' for k in keys)}",
+                    [*values.values(), *(row[k] for k in keys)],
+                )
+                updated += 1
+    return updated
@@ -1,17 +1,98 @@
-"""Shared CSS injection for the F1 Predictions app."""
+"""Shared CSS injection for the F1 Predictions app.
+
+The stylesheet is minified once per process and written to ``static/`` under
+a content-hashed name, so each rerun only sends a couple of ``<link>`` tags
+and browsers keep the file until the CSS actually changes. Streamlit serves
+``static/`` at ``app/static/`` when ``server.enableStaticServing`` is on
+(see .streamlit/config.toml). Streamlit before 1.57 sends ``app/static``
+CSS as ``text/plain`` with ``nosniff``, which browsers refuse to apply, so
+there, with static serving off, or if ``static/`` is not writable, the
+minified CSS is inlined as before.
+
+``python build_assets.py`` builds the file ahead of time.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import logging
 import os
+import re
+
 import streamlit as st
+from packaging.version import Version
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(__file__))
+CSS_PATH = os.path.join(_ROOT, "assets", "style.css")
+STATIC_DIR = os.path.join(_ROOT, "static")
+STATIC_URL = "app/static"
+STATIC_CSS_MIN_VERSION = Version("1.57")  # first release serving app/static CSS as text/css
+
+_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_IMPORT_RE = re.compile(r"""@import\s+url\(\s*(['"]?)(.*?)\1\s*\)\s*;""")
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def minify_css(css: str) -> str:
+    """Drop comments and redundant whitespace, leaving string literals intact."""
+    parts = _STRING_RE.split(re.sub(r"/\*.*?\*/", "", css, flags=re.S))
+    for i in range(0, len(parts), 2):  # even indices are outside strings
+        code = re.sub(r"\s+", " ", parts[i])
+        code = re.sub(r"\s*([{};,])\s*", r"\1", code)
+        code = re.sub(r":\s+", ":", code)
+        parts[i] = code.replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def split_imports(css: str) -> tuple[list[str], str]:
+    """Pull ``@import url(...)`` rules out so they can load as parallel ``<link>`` tags."""
+    return [m.group(2) for m in _IMPORT_RE.finditer(css)], _IMPORT_RE.sub("", css)
+
+
+def build_stylesheet() -> tuple[list[str], str, str]:
+    """Return ``(imported URLs, minified CSS, hashed file name)`` for assets/style.css."""
+    with open(CSS_PATH) as f:
+        imports, css = split_imports(f.read())
+    css = minify_css(css)
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    return imports, css, f"style.{digest}.css"
+
+
+def write_static(name: str, css: str) -> str:
+    """Write *css* to ``static/<name>`` unless already there; return the path."""
+    path = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(css)
+        os.replace(tmp, path)  # atomic: a request never sees a partial file
+    return path
 
-_CSS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "style.css")
 
+# ---------------------------------------------------------------------------
+# Serve
+# ---------------------------------------------------------------------------
 
 @st.cache_resource
-def _load_css() -> str:
-    """Read the global stylesheet once and cache it."""
-    with open(_CSS_PATH) as f:
-        return f.read()
+def _head_tags() -> str:
+    """Build the stylesheet once per process and return the tags that load it."""
+    imports, css, name = build_stylesheet()
+    links = "".join(f'<link rel="stylesheet" href="{html.escape(url)}">' for url in imports)
+    if st.get_option("server.enableStaticServing") and Version(st.__version__) >= STATIC_CSS_MIN_VERSION:
+        try:
+            write_static(name, css)
+            return links + f'<link rel="stylesheet" href="{STATIC_URL}/{name}">'
+        except OSError as e:
+            logger.warning("serving inline CSS, could not write %s: %s", name, e)
+    return links + f"<style>{css}</style>"
 
 
 def inject_styles() -> None:
     """Inject the global CSS into the current page."""
-    st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
+    st.markdown(_head_tags(), unsafe_allow_html=True)
@@ -0,0 +1,207 @@
+"""Lightweight timing of data calls and HTML renderers.
+
+Functions decorated with :func:`instrument` record their duration and
+output size (rows and bytes for DataFrames, bytes for HTML) into the
+current rerun, which pages open with :func:`start_run` and close with
+:func:`finish_run`. Fragments that rerun on their own wrap their body in
+:func:`fragment_run`, so those reruns are recorded too. Closing a run:
+
+* aggregates it per page (see :func:`page_stats`),
+* emits structured JSON log lines on the ``f1.telemetry`` logger
+  (one per rerun at INFO, one per call at DEBUG),
+* draws a debug panel when the page is opened with ``?debug=1`` or the
+  ``DEBUG_PANEL`` setting is on.
+
+Set ``TELEMETRY=0`` to turn recording off entirely.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+import pandas as pd
+import streamlit as st
+
+from utils.config import get_setting
+
+logger = logging.getLogger("f1.telemetry")
+
+_OFF = {"0", "false", "no", "off"}
+
+
+@dataclass
+class Run:
+    page: str
+    started: float = field(default_factory=time.perf_counter)
+    events: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class PageStats:
+    runs: int = 0
+    total_ms: float = 0.0
+    data_ms: float = 0.0
+    render_ms: float = 0.0
+    last_ms: float = 0.0
+
+
+_current: contextvars.ContextVar[Run | None] = contextvars.ContextVar("f1_telemetry_run", default=None)
+_pages: dict[str, PageStats] = {}
+_pages_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def enabled() -> bool:
+    return str(get_setting("TELEMETRY", "1")).lower() not in _OFF
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def _measure(result: Any) -> tuple[int | None, int | None]:
+    """Return ``(rows, bytes)`` for a call result."""
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=False, deep=True).sum())
+    if isinstance(result, str):
+        return None, len(result.encode())
+    return None, None
+
+
+def instrument(kind: str) -> Callable:
+    """Decorator: record each call's time and output size under *kind*."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            run = _current.get()
+            if run is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            rows, size = _measure(result)
+            run.events.append({
+                "kind": kind,
+                "name": fn.__name__,
+                "ms": (time.perf_counter() - t0) * 1000,
+                "rows": rows,
+                "bytes": size,
+            })
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def start_run(page: str) -> None:
+    """Open a rerun for *page*; calls are recorded until :func:`finish_run`."""
+    _current.set(Run(page) if enabled() else None)
+
+
+@contextlib.contextmanager
+def fragment_run(page: str) -> Iterator[None]:
+    """Record a fragment-only rerun as a run of *page* (e.g. ``"race/grid"``).
+
+    When the fragment runs as part of a full page rerun, its calls are
+    counted in the page's run instead. Also usable as a decorator.
+    """
+    if _current.get() is not None:
+        yield
+        return
+    start_run(page)
+    try:
+        yield
+    finally:
+        finish_run()
+
+
+def _summarize(run: Run) -> dict:
+    summary: dict[str, Any] = {"event": "rerun", "page": run.page, "ms": (time.perf_counter() - run.started) * 1000}
+    for kind in ("data", "render"):
+        events = [e for e in run.events if e["kind"] == kind]
+        summary[f"{kind}_calls"] = len(events)
+        summary[f"{kind}_ms"] = sum(e["ms"] for e in events)
+        summary[f"{kind}_bytes"] = sum(e["bytes"] or 0 for e in events)
+    summary["rows"] = sum(e["rows"] or 0 for e in run.events if e["kind"] == "data")
+    return summary
+
+
+def _log_line(record: dict) -> str:
+    return json.dumps({k: round(v, 2) if isinstance(v, float) else v for k, v in record.items()})
+
+
+def finish_run() -> dict | None:
+    """Close the current rerun, log and aggregate it, and show the debug panel."""
+    run = _current.get()
+    if run is None:
+        return None
+    _current.set(None)
+    summary = _summarize(run)
+    with _pages_lock:
+        stats = _pages.setdefault(run.page, PageStats())
+        stats.runs += 1
+        stats.total_ms += summary["ms"]
+        stats.data_ms += summary["data_ms"]
+        stats.render_ms += summary["render_ms"]
+        stats.last_ms = summary["ms"]
+    if logger.isEnabledFor(logging.DEBUG):
+        for e in run.events:
+            logger.debug(_log_line({"event": "call", "page": run.page, **e}))
+    logger.info(_log_line(summary))
+    if _show_panel():
+        _debug_panel(run, summary)
+    return summary
+
+
+def page_stats() -> dict[str, PageStats]:
+    """Per-page aggregates since the process started."""
+    with _pages_lock:
+        return {page: PageStats(**vars(s)) for page, s in _pages.items()}
+
+
+# ---------------------------------------------------------------------------
+# Debug panel
+# ---------------------------------------------------------------------------
+
+def _show_panel() -> bool:
+    if st.query_params.get("debug") == "1":
+        return True
+    return str(get_setting("DEBUG_PANEL", "0")).lower() not in _OFF
+
+
+def _debug_panel(run: Run, summary: dict) -> None:
+    from utils.data_helpers import cache_stats
+
+    with st.expander(f"Debug · {summary['ms']:.0f} ms this rerun", expanded=False):
+        cols = st.columns(4)
+        cols[0].metric("Data calls", summary["data_calls"], f"{summary['data_ms']:.1f} ms", delta_color="off")
+        cols[1].metric("Rows", summary["rows"], f"{summary['data_bytes'] / 1024:.0f} KiB", delta_color="off")
+        cols[2].metric("Renders", summary["render_calls"], f"{summary['render_ms']:.1f} ms", delta_color="off")
+        cols[3].metric("HTML", f"{summary['render_bytes'] / 1024:.0f} KiB")
+
+        if run.events:
+            calls = (
+                pd.DataFrame(run.events)
+                .groupby(["kind", "name"], as_index=False)
+                .agg(calls=("ms", "size"), ms=("ms", "sum"), rows=("rows", "sum"), bytes=("bytes", "sum"))
+                .sort_values("ms", ascending=False)
+            )
+            st.dataframe(calls, hide_index=True, use_container_width=True)
+
+        pages = pd.DataFrame(
+            [
+                {"page": p, "reruns": s.runs, "avg ms": s.total_ms / s.runs,
+                 "avg data ms": s.data_ms / s.runs, "avg render ms": s.render_ms / s.runs, "last ms": s.last_ms}
+                for p, s in page_stats().items()
+            ]
+        )
+        st.dataframe(pages, hide_index=True, use_container_width=True)
+        st.caption("Read cache: " + ", ".join(f"{t} {s['hits']}/{s['hits'] + s['misses']}" for t, s in cache_stats().items()))
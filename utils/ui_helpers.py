@@ -1,9 +1,18 @@
 """UI helper functions for the F1 Predictions app."""
 from __future__ import annotations
 
-import pandas as pd
+import functools
+from bisect import bisect_left
 from datetime import date
-from utils.constants import TEAM_COLORS
+
+import pandas as pd
+from utils.constants import PLACEHOLDER, TEAM_COLORS
+from utils.telemetry import instrument
+
+# Bound for each memoized renderer below. Inputs are reduced to the
+# hashable values that affect the HTML, so identical predictions rendered
+# for any session hit the same entry.
+RENDER_CACHE_SIZE = 256
 
 
 # ---------------------------------------------------------------------------
@@ -19,6 +28,58 @@ def driver_with_team(name: str, drivers_df: pd.DataFrame) -> str:
     return f"{name}  —  {team}"
 
 
+class OptionIndex:
+    """Precomputed lookups for a grid of mutually exclusive dropdowns.
+
+    Holds name→label and name→team maps plus each name's rank, so a whole
+    grid of selectboxes can be built in one pass per rerun with O(1)
+    ``format_func`` lookups instead of DataFrame scans per option.
+    """
+
+    def __init__(self, names: tuple[str, ...], teams: tuple[str, ...] | None = None) -> None:
+        self.names = names
+        self.rank = {name: i for i, name in enumerate(names)}
+        self.teams: dict[str, str] = dict(zip(names, teams)) if teams else {}
+        self.labels = {PLACEHOLDER: PLACEHOLDER}
+        for name in names:
+            team = self.teams.get(name)
+            self.labels[name] = f"{name}  —  {team}" if team else name
+
+    def label(self, value: str) -> str:
+        return self.labels.get(value, value)
+
+    def grid_options(self, current: dict[str, str]) -> dict[str, list[str]]:
+        """Return the options for every slot given ``{slot: current value}``.
+
+        Each slot offers the placeholder, every name not taken by another
+        slot, and its own current value, in the original name order.
+        """
+        taken = {v for v in current.values() if v in self.rank}
+        free = [n for n in self.names if n not in taken]
+        free_ranks = [self.rank[n] for n in free]
+        options: dict[str, list[str]] = {}
+        for slot, value in current.items():
+            if value in self.rank:
+                k = bisect_left(free_ranks, self.rank[value])
+                options[slot] = [PLACEHOLDER, *free[:k], value, *free[k:]]
+            else:
+                options[slot] = [PLACEHOLDER, *free]
+        return options
+
+
+@functools.lru_cache(maxsize=8)
+def build_option_index(names: tuple[str, ...], teams: tuple[str, ...] | None = None) -> OptionIndex:
+    """Return a shared :class:`OptionIndex`, built once per distinct name list."""
+    return OptionIndex(names, teams)
+
+
+def driver_option_index(drivers_df: pd.DataFrame) -> OptionIndex:
+    """Option index over drivers, labelled 'Name — Team'."""
+    return build_option_index(
+        tuple(drivers_df["Driver Name"]), tuple(drivers_df["Driver Team"])
+    )
+
+
 def pos_class(i: int) -> str:
     """Return CSS class for position badge based on position number."""
     if i == 1:
@@ -41,12 +102,14 @@ def get_team_color(team_name: str) -> str:
 # Top Navigation Bar
 # ---------------------------------------------------------------------------
 
+@instrument("render")
+@functools.lru_cache(maxsize=8)
 def render_navbar(active: str = "home") -> str:
     """Render a sticky top navigation bar with F1 branding.
 
     Parameters
     ----------
-    active : one of 'home', 'season', 'race', 'fun'
+    active : one of 'home', 'season', 'race', 'fun', 'leaderboard', 'insights'
     """
     def _link(label: str, page_key: str, href: str, icon: str) -> str:
         cls = "nav-link active" if active == page_key else "nav-link"
@@ -57,6 +120,8 @@ def render_navbar(active: str = "home") -> str:
         + _link("Season", "season", "/Season_Predictions", "")
         + _link("Race", "race", "/Race_Predictions", "")
         + _link("Fun", "fun", "/Fun_Predictions", "")
+        + _link("Leaderboard", "leaderboard", "/Leaderboard", "")
+        + _link("Insights", "insights", "/Insights", "")
     )
 
     return (
@@ -78,6 +143,7 @@ def render_navbar(active: str = "home") -> str:
 # Page structure
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_page_header(title: str, subtitle: str) -> str:
     """Generate HTML for a page header with carbon-fiber texture."""
     return (
@@ -88,6 +154,7 @@ def render_page_header(title: str, subtitle: str) -> str:
     )
 
 
+@instrument("render")
 def render_hero(title: str, subtitle: str = "") -> str:
     """Generate HTML for the home hero section."""
     sub_html = f"<p>{subtitle}</p>" if subtitle else ""
@@ -96,6 +163,7 @@ def render_hero(title: str, subtitle: str = "") -> str:
     )
 
 
+@instrument("render")
 def render_countdown(race_name: str, countdown_text: str) -> str:
     """Generate HTML for the next-race countdown bar."""
     return (
@@ -106,6 +174,7 @@ def render_countdown(race_name: str, countdown_text: str) -> str:
     )
 
 
+@instrument("render")
 def render_stat_cards(stats: list[tuple]) -> str:
     """Generate stat card row. stats = [(value, label), ...]"""
     cards = "".join(
@@ -118,6 +187,7 @@ def render_stat_cards(stats: list[tuple]) -> str:
     return f'<div class="stat-row">{cards}</div>'
 
 
+@instrument("render")
 def render_nav_cards(cards: list[tuple[str, str, str, str]]) -> str:
     """Generate clickable navigation cards.
 
@@ -136,6 +206,7 @@ def render_nav_cards(cards: list[tuple[str, str, str, str]]) -> str:
     return f'<div class="nav-cards">{items}</div>'
 
 
+@instrument("render")
 def render_section_header(title: str) -> str:
     """Generate a styled section header with accent line."""
     return (
@@ -146,12 +217,14 @@ def render_section_header(title: str) -> str:
     )
 
 
+@instrument("render")
 def render_divider(accent: bool = False) -> str:
     """Generate a styled divider."""
     cls = "f1-divider-accent" if accent else "f1-divider"
     return f'<div class="{cls}"></div>'
 
 
+@instrument("render")
 def render_footer() -> str:
     """Generate the app footer."""
     return (
@@ -166,6 +239,7 @@ def render_footer() -> str:
 # Custom toast notifications (replaces st.success / st.error / st.info)
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_toast(message: str, kind: str = "info") -> str:
     """Generate a custom toast notification.
 
@@ -185,6 +259,7 @@ def render_toast(message: str, kind: str = "info") -> str:
 # Empty state
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_empty_state(message: str, icon: str = "") -> str:
     """Render a styled empty state placeholder."""
     return (
@@ -199,32 +274,34 @@ def render_empty_state(message: str, icon: str = "") -> str:
 # Race calendar
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_race_calendar(races_df: pd.DataFrame, max_races: int | None = None) -> str:
     """Render a grid of race calendar cards."""
-    today = date.today()
-    cards: list[str] = []
-    found_next = False
     df = races_df if max_races is None else races_df.head(max_races)
+    return _render_race_calendar(
+        tuple(df["Round Number"]),
+        tuple(df["Race Name"]),
+        tuple(df["Race Date"]),
+        date.today(),
+    )
 
-    for _, row in df.iterrows():
-        rnd = row["Round Number"]
-        name = row["Race Name"]
-        race_date_str = row["Race Date"]
-
-        try:
-            from datetime import datetime
-            race_date = datetime.strptime(race_date_str, "%m/%d/%Y").date()
-        except Exception:
-            race_date = None
-
-        extra_cls = ""
-        if race_date:
-            if race_date < today:
-                extra_cls = "is-past"
-            elif not found_next and race_date >= today:
-                extra_cls = "is-next"
-                found_next = True
 
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_race_calendar(
+    rounds: tuple[str, ...],
+    names: tuple[str, ...],
+    date_strs: tuple[str, ...],
+    today: date,
+) -> str:
+    race_dates = pd.to_datetime(pd.Series(date_strs, dtype=object), format="%m/%d/%Y", errors="coerce")
+    known = race_dates.notna().to_numpy()
+    is_past = known & (race_dates.dt.date < today).to_numpy()
+    upcoming = (known & ~is_past).nonzero()[0]
+    next_idx = upcoming[0] if len(upcoming) else -1
+
+    cards: list[str] = []
+    for i, (rnd, name, race_date_str) in enumerate(zip(rounds, names, date_strs)):
+        extra_cls = "is-past" if is_past[i] else ("is-next" if i == next_idx else "")
         cards.append(
             f'<div class="calendar-race {extra_cls}">'
             f'<div class="calendar-round">{rnd}</div>'
@@ -240,6 +317,7 @@ def render_race_calendar(races_df: pd.DataFrame, max_races: int | None = None) -
 # Podium display
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_podium(
     drivers: list[str],
     driver_teams: dict[str, str],
@@ -247,9 +325,16 @@ def render_podium(
     """Render a podium visualization for the top 3 drivers."""
     if len(drivers) < 3:
         return ""
+    return _render_podium(tuple((d, driver_teams.get(d, "")) for d in drivers[:3]))
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_podium(top3: tuple[tuple[str, str], ...]) -> str:
+    teams = dict(top3)
+    drivers = [d for d, _ in top3]
 
     def _slot(driver: str, pos: int, css_cls: str) -> str:
-        team = driver_teams.get(driver, "")
+        team = teams[driver]
         color = TEAM_COLORS.get(team, "#484f58")
         return (
             f'<div class="podium-slot {css_cls}">'
@@ -273,6 +358,7 @@ def render_podium(
 # Timing tower
 # ---------------------------------------------------------------------------
 
+@instrument("render")
 def render_timing_tower(
     user: str,
     positions: list[str],
@@ -282,6 +368,20 @@ def render_timing_tower(
     placeholder: str = "-- Select --",
 ) -> str:
     """Render an F1-style timing tower for a user's predictions."""
+    entries = []
+    for pos in positions:
+        name = pos_values.get(pos, "")
+        entries.append((name, driver_teams.get(name, "")))
+    return _render_timing_tower(user, tuple(entries), championship_label, placeholder)
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_timing_tower(
+    user: str,
+    entries: tuple[tuple[str, str], ...],
+    championship_label: str,
+    placeholder: str,
+) -> str:
     avatar_letter = user[0].upper() if user else "?"
 
     header = (
@@ -294,8 +394,7 @@ def render_timing_tower(
     )
 
     rows: list[str] = []
-    for i, pos in enumerate(positions, 1):
-        name = pos_values.get(pos, "")
+    for i, (name, team) in enumerate(entries, 1):
         if not name or name == placeholder:
             continue
 
@@ -318,7 +417,6 @@ def render_timing_tower(
                 f"</div>"
             )
         else:
-            team = driver_teams.get(name, "")
             color = TEAM_COLORS.get(team, "#484f58")
             rows.append(
                 f'<div class="timing-row {podium_cls}">'
@@ -331,3 +429,35 @@ def render_timing_tower(
 
     body = f'<div class="timing-tower-body">{"".join(rows)}</div>'
     return f'<div class="timing-tower">{header}{body}</div>'
+
+
+# ---------------------------------------------------------------------------
+# League standings
+# ---------------------------------------------------------------------------
+
+@instrument("render")
+def render_standings(standings: list[tuple[str, int, int]], subtitle: str) -> str:
+    """Render the league table in timing-tower style.
+
+    standings = [(user, total points, points from the latest race), ...], best first.
+    """
+    header = (
+        '<div class="timing-tower-header">'
+        '<div class="user-avatar">#</div>'
+        '<div class="user-info">'
+        '<div class="user-label">League Standings</div>'
+        f'<div class="championship-label">{subtitle}</div>'
+        "</div></div>"
+    )
+    rows: list[str] = []
+    for i, (user, total, last) in enumerate(standings, 1):
+        podium_cls = f"podium-{i}" if i <= 3 else ""
+        rows.append(
+            f'<div class="timing-row {podium_cls}">'
+            f'<div class="t-pos"><span class="pos-label {pos_class(i)}">P{i}</span></div>'
+            f'<div class="t-driver">{user}</div>'
+            f'<div class="t-team">{total} pts (+{last})</div>'
+            f"</div>"
+        )
+    body = f'<div class="timing-tower-body">{"".join(rows)}</div>'
+    return f'<div class="timing-tower">{header}{body}</div>'